@@ -0,0 +1,116 @@
+"""
+Bounded in-process LRU + TTL cache for hot read paths.
+
+Keys are tuples whose first element names the resource ("blog", "blog_list",
+"user", "comments"), so a whole resource family can be dropped with
+invalidate_prefix(). Writers invalidate after they commit. The cache is
+per-process: other workers only see a write once their entry's TTL expires.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so in-flight loads can't store stale values
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float = None, epoch: int = None):
+        """Store a value. If `epoch` is given and an invalidation happened since, skip the store."""
+        with self._lock:
+            if epoch is not None and epoch != self._epoch:
+                return
+            self._entries[key] = (value, time.monotonic() + (ttl or self.ttl_seconds))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: float = None) -> Any:
+        """Return the cached value, or call `loader` and cache its result.
+
+        Exceptions raised by the loader (e.g. a 404) propagate and nothing is cached.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        epoch = self.epoch
+        value = loader()
+        self.set(key, value, ttl=ttl, epoch=epoch)
+        return value
+
+    @property
+    def epoch(self) -> int:
+        """Snapshot to pass to set() so a load that raced an invalidation is not stored."""
+        return self._epoch
+
+    def invalidate(self, *keys: Hashable):
+        with self._lock:
+            self._epoch += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def invalidate_prefix(self, *prefixes: str):
+        """Drop every entry whose key starts with one of the given resource names."""
+        with self._lock:
+            self._epoch += 1
+            doomed = [key for key in self._entries if isinstance(key, tuple) and key[0] in prefixes]
+            for key in doomed:
+                del self._entries[key]
+            self.invalidations += len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+read_cache = TTLCache(
+    max_entries=int(os.getenv("READ_CACHE_MAX_ENTRIES", "2048")),
+    ttl_seconds=float(os.getenv("READ_CACHE_TTL_SECONDS", "60")),
+)
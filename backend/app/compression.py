@@ -0,0 +1,191 @@
+"""
+Response compression.
+
+CompressionMiddleware gzip/brotli-encodes complete (non-streaming) text and
+JSON responses on the fly. Cacheable resources skip that path: they keep a
+CachedBody in the read cache, which renders the JSON once and memoizes each
+compressed variant, so a popular post is compressed once rather than on every
+request. Brotli is used when the `brotli` package is installed.
+"""
+import gzip
+import threading
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 500
+
+# On-the-fly compression favours speed; cached variants are compressed once, so squeeze harder
+DYNAMIC_GZIP_LEVEL = 6
+DYNAMIC_BROTLI_QUALITY = 4
+CACHED_GZIP_LEVEL = 9
+CACHED_BROTLI_QUALITY = 9
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# Avatar files get a new timestamped name on every upload, so they never change in place
+STATIC_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def supported_encodings():
+    return ("br", "gzip") if brotli else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best supported encoding from an Accept-Encoding header, or None."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in supported_encodings():
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=CACHED_BROTLI_QUALITY if cached else DYNAMIC_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=CACHED_GZIP_LEVEL if cached else DYNAMIC_GZIP_LEVEL, mtime=0)
+
+
+def encoded_etag(etag: Optional[str], encoding: Optional[str]) -> Optional[str]:
+    """Give each encoded representation its own strong ETag ("abc" -> "abc-gzip")."""
+    if not etag or not encoding:
+        return etag
+    return etag[:-1] + f"-{encoding}" + '"'
+
+
+class CachedBody:
+    """A JSON body rendered once, with compressed variants memoized on first use."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._variants: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_model(cls, model_cls, payload, **dump_kwargs) -> "CachedBody":
+        return cls(model_cls.model_validate(payload).model_dump_json(**dump_kwargs).encode("utf-8"))
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if not encoding or len(self.body) < MIN_COMPRESS_SIZE:
+            return self.body
+        variant = self._variants.get(encoding)
+        if variant is None:
+            with self._lock:
+                variant = self._variants.get(encoding)
+                if variant is None:
+                    variant = compress(self.body, encoding, cached=True)
+                    self._variants[encoding] = variant
+        return variant
+
+    def negotiate(self, request: Request) -> Optional[str]:
+        """The encoding this body will be sent in for the given request."""
+        if len(self.body) < MIN_COMPRESS_SIZE:
+            return None
+        return negotiate_encoding(request.headers.get("accept-encoding"))
+
+    def response(self, request: Request, headers: Optional[dict] = None) -> Response:
+        """Build a JSON response in the best encoding the client accepts."""
+        headers = dict(headers or {})
+        encoding = self.negotiate(request)
+        headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            headers["ETag"] = encoded_etag(headers.get("ETag"), encoding)
+        return Response(content=self.encoded(encoding), media_type="application/json", headers=headers)
+
+
+class CompressionMiddleware:
+    """Compress complete text/JSON responses; streaming responses pass through untouched."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        encoding = negotiate_encoding(request_headers.get("accept-encoding"))
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            if message.get("more_body", False) or not self._should_compress(start, body):
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers = [
+                (k, v) for k, v in start["headers"]
+                if k.lower() not in (b"content-length", b"etag", b"vary")
+            ]
+            original = {k.lower(): v for k, v in start["headers"]}
+            vary = original.get(b"vary", b"").decode("latin-1")
+            if "accept-encoding" not in vary.lower():
+                vary = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+            headers.append((b"vary", vary.encode("latin-1")))
+            if b"etag" in original:
+                etag = encoded_etag(original[b"etag"].decode("latin-1"), encoding)
+                headers.append((b"etag", etag.encode("latin-1")))
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+            headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _should_compress(start, body: bytes) -> bool:
+        if len(body) < MIN_COMPRESS_SIZE:
+            return False
+        headers = {k.lower(): v.decode("latin-1") for k, v in start["headers"]}
+        if b"content-encoding" in headers:
+            return False
+        content_type = headers.get(b"content-type", "")
+        if content_type.startswith("text/event-stream"):
+            return False
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers and CDNs cache files for a long time."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("Cache-Control", STATIC_CACHE_CONTROL)
+        return response
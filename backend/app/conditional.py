@@ -0,0 +1,113 @@
+"""
+HTTP validators (ETag / Last-Modified) and conditional GET handling.
+
+Single resources are validated by their id and `updated_at`. Collections are
+validated by a version counter in `collection_versions`, which writers bump
+in the same transaction as the change via bump_collection_version().
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from . import models
+
+BLOGS_COLLECTION = "blogs"
+
+# Clients may keep a copy but must revalidate it on every use
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the given parts."""
+    raw = "|".join(str(part) for part in parts)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+
+def bump_collection_version(db: Session, name: str = BLOGS_COLLECTION):
+    """Mark a collection as changed. Caller commits."""
+    now = datetime.now().isoformat()
+    db.execute(
+        insert(models.CollectionVersion)
+        .values(name=name, version=1, updated_at=now)
+        .on_conflict_do_update(
+            index_elements=["name"],
+            set_={"version": models.CollectionVersion.version + 1, "updated_at": now},
+        )
+    )
+
+
+def get_collection_version(db: Session, name: str = BLOGS_COLLECTION) -> Tuple[int, Optional[str]]:
+    """Return (version, updated_at) for a collection; (0, None) if never written."""
+    row = (
+        db.query(models.CollectionVersion.version, models.CollectionVersion.updated_at)
+        .filter(models.CollectionVersion.name == name)
+        .first()
+    )
+    if not row:
+        return 0, None
+    return row.version or 0, row.updated_at
+
+
+def http_date(iso_timestamp: Optional[str]) -> Optional[str]:
+    """Format a stored ISO timestamp (local time) as an HTTP date."""
+    if not iso_timestamp:
+        return None
+    try:
+        moment = datetime.fromisoformat(iso_timestamp)
+    except ValueError:
+        return None
+    return format_datetime(moment.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+# Suffixes the compression layer appends to ETags of encoded representations
+ENCODING_ETAG_SUFFIXES = ('-gzip"', '-br"')
+
+
+def _base_etag(tag: str) -> str:
+    # If-None-Match uses weak comparison, so ignore W/ prefixes
+    tag = tag.strip().removeprefix("W/")
+    for suffix in ENCODING_ETAG_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    return any(_base_etag(tag) == etag for tag in header.split(","))
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[str] = None) -> bool:
+    """Evaluate If-None-Match, then If-Modified-Since, against the current validators."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+            modified = parsedate_to_datetime(last_modified)
+        except (TypeError, ValueError):
+            return False
+        return modified <= since
+    return False
+
+
+def validator_headers(etag: str, last_modified: Optional[str] = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return headers
+
+
+def not_modified(etag: str, last_modified: Optional[str] = None) -> Response:
+    """Empty 304 response carrying the validators."""
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
@@ -0,0 +1,273 @@
+"""
+Materialized AI-derived fields on blog posts.
+
+Writers call stamp_content(blog) in the same session as the change. It
+records the content hash, word count and reading time, and, when the content
+actually changed, marks the post `derived_pending`. After committing they
+call derived_fields.notify(). Background workers then compute the summary
+and headline suggestions (through the handler routes/ai.py registers, at
+bulk priority) and store them with the content hash they were computed
+from, so reads return them without any AI call. Only answers from an AI
+provider are stored: while none is available the post stays pending and is
+retried later, rather than keeping a local or template fallback for good.
+Bulk imports stamp posts with derive=False unless they opt in, so importing
+an archive does not queue AI calls for every post.
+
+The pending flag lives on the row, so work left over by a restart is picked
+up again on startup. Bumping DERIVED_VERSION marks every derived post pending.
+"""
+import asyncio
+import hashlib
+import math
+import os
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import inspect, text
+
+from . import models
+from .cache import read_cache
+from .database import SessionLocal
+from .llm.gateway import LLMUnavailable
+from .llm.scheduler import BULK, caller_var, priority_var
+
+# Bump when the way summaries or headlines are derived changes
+DERIVED_VERSION = 1
+
+WORDS_PER_MINUTE = 200
+
+# Posts claimed per round, and how long idle workers wait before looking for missed work
+BATCH_SIZE = 20
+POLL_SECONDS = 60.0
+
+MAX_ATTEMPTS = 3
+FAILURE_BACKOFF_SECONDS = 30.0
+# No AI provider answered: the post stays pending and the round is retried after this
+UNAVAILABLE_BACKOFF_SECONDS = POLL_SECONDS
+
+# Columns added to `blogs` after its first release, with their SQLite types
+DERIVED_COLUMNS = {
+    "content_hash": "VARCHAR",
+    "word_count": "INTEGER",
+    "reading_time": "INTEGER",
+    "summary": "VARCHAR",
+    "headline_suggestions": "JSON",
+    "derived_hash": "VARCHAR",
+    "derived_version": "INTEGER",
+    "derived_at": "VARCHAR",
+    "derived_pending": "INTEGER DEFAULT 0",
+}
+
+
+def ensure_derived_columns(engine):
+    """Add the derived columns to an existing `blogs` table (create_all() skips existing tables)."""
+    existing = {column["name"] for column in inspect(engine).get_columns("blogs")}
+    with engine.begin() as conn:
+        for name, sql_type in DERIVED_COLUMNS.items():
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE blogs ADD COLUMN {name} {sql_type}"))
+
+
+def content_hash(content: Optional[str]) -> str:
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+
+def reading_stats(content: Optional[str]) -> Tuple[int, int]:
+    """(word count, reading time in minutes) of a post."""
+    words = len((content or "").split())
+    return words, max(1, math.ceil(words / WORDS_PER_MINUTE)) if words else 0
+
+
+def stamp_content(blog: models.Blog, derive: bool = True):
+    """Refresh the content-derived columns of `blog`. Caller commits, then calls derived_fields.notify().
+
+    With derive=False only the local columns (hash, reading stats) are filled
+    and the post is not queued for AI-derived fields.
+    """
+    digest = content_hash(blog.content)
+    if digest == blog.content_hash and blog.word_count is not None:
+        return
+    blog.content_hash = digest
+    blog.word_count, blog.reading_time = reading_stats(blog.content)
+    if derive and (blog.derived_hash != digest or blog.derived_version != DERIVED_VERSION):
+        blog.derived_pending = 1
+
+
+class DerivedFieldsUpdater:
+    def __init__(self):
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._handler: Optional[Callable[[str], Awaitable[tuple]]] = None
+        # (blog id, content hash) -> failed attempts; that version of the post is skipped after MAX_ATTEMPTS
+        self._failures: Dict[Tuple[int, str], int] = {}
+        self.computed = 0
+        self.failed = 0
+        self.deferred = 0
+
+    def set_handler(self, handler: Callable[[str], Awaitable[tuple]]):
+        """`handler(content)` returns (summary, headline suggestions) for a post.
+
+        It raises LLMUnavailable instead of returning fallback text when no AI provider answers.
+        """
+        self._handler = handler
+
+    # --- persistence (runs in the threadpool) ---
+
+    def _mark_outdated(self) -> int:
+        """Flag posts derived by an older DERIVED_VERSION. Returns how many posts are pending.
+
+        Posts that were never derived (bulk imports without derive) are left alone.
+        """
+        db = SessionLocal()
+        try:
+            Blog = models.Blog
+            db.query(Blog).filter(
+                Blog.derived_pending != 1,
+                Blog.derived_version.isnot(None),
+                Blog.derived_version != DERIVED_VERSION,
+            ).update({"derived_pending": 1}, synchronize_session=False)
+            db.commit()
+            return db.query(Blog.id).filter(Blog.derived_pending == 1).count()
+        finally:
+            db.close()
+
+    def _pending(self) -> List[Tuple[int, str, str]]:
+        db = SessionLocal()
+        try:
+            Blog = models.Blog
+            rows = (
+                db.query(Blog.id, Blog.content_hash, Blog.content)
+                .filter(Blog.derived_pending == 1)
+                .order_by(Blog.id)
+                .limit(BATCH_SIZE + len(self._failures))
+                .all()
+            )
+            ready = [
+                (row.id, row.content_hash, row.content or "")
+                for row in rows
+                if self._failures.get((row.id, row.content_hash), 0) < MAX_ATTEMPTS
+            ]
+            return ready[:BATCH_SIZE]
+        finally:
+            db.close()
+
+    def _store(self, blog_id: int, digest: str, summary: str, headlines: list) -> bool:
+        """Save derived fields unless the post changed meanwhile (a newer round will handle it)."""
+        db = SessionLocal()
+        try:
+            Blog = models.Blog
+            updated = (
+                db.query(Blog)
+                .filter(Blog.id == blog_id, Blog.content_hash == digest)
+                .update(
+                    {
+                        "summary": summary,
+                        "headline_suggestions": headlines,
+                        "derived_hash": digest,
+                        "derived_version": DERIVED_VERSION,
+                        "derived_at": datetime.now().isoformat(),
+                        "derived_pending": 0,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return bool(updated)
+        finally:
+            db.close()
+
+    # --- lifecycle ---
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        try:
+            pending = await run_in_threadpool(self._mark_outdated)
+        except Exception as e:
+            print(f"[derived] Could not scan for outdated posts: {e}")
+            pending = 0
+        self.notify()
+        print(f"[derived] Derived-field worker started, {pending} post(s) pending")
+
+    async def stop(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+
+    def notify(self):
+        """Wake the workers after a write. Safe to call from any thread."""
+        if self._loop is None or self._wake is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _dispatch(self):
+        caller_var.set("system:derived")
+        priority_var.set(BULK)
+        concurrency = max(1, int(os.getenv("AI_DERIVED_WORKERS", "2")))
+        while True:
+            try:
+                batch = await run_in_threadpool(self._pending)
+            except Exception as e:
+                print(f"[derived] Could not load pending posts: {e}")
+                batch = []
+            if not batch:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def run(item):
+                async with semaphore:
+                    return await self._compute(*item)
+
+            backoffs = [delay for delay in await asyncio.gather(*(run(item) for item in batch)) if delay]
+            if backoffs:
+                await asyncio.sleep(max(backoffs))
+
+    async def _compute(self, blog_id: int, digest: str, content: str) -> float:
+        """Derive and store one post. Returns how long to back off before the next round (0 if none)."""
+        try:
+            summary, headlines = await self._handler(content)
+            if await run_in_threadpool(self._store, blog_id, digest, summary, headlines):
+                read_cache.invalidate(("blog", blog_id))
+                self.computed += 1
+            self._failures.pop((blog_id, digest), None)
+            return 0.0
+        except LLMUnavailable:
+            # Providers down, unconfigured or circuit open: not this post's fault, keep it pending
+            self.deferred += 1
+            return UNAVAILABLE_BACKOFF_SECONDS
+        except HTTPException as e:
+            if e.status_code == 429:
+                # Scheduler is saturated: leave the post pending and slow down
+                return float((e.headers or {}).get("Retry-After", FAILURE_BACKOFF_SECONDS))
+            error = str(e.detail)
+        except Exception as e:
+            error = str(e)
+        self.failed += 1
+        key = (blog_id, digest)
+        self._failures[key] = self._failures.get(key, 0) + 1
+        print(f"[derived] Post {blog_id} failed (attempt {self._failures[key]}): {error}")
+        return FAILURE_BACKOFF_SECONDS
+
+    def stats(self) -> dict:
+        return {
+            "running": self._dispatcher is not None,
+            "version": DERIVED_VERSION,
+            "computed": self.computed,
+            "failed": self.failed,
+            "deferred_no_provider": self.deferred,
+            "skipped_after_failures": sum(1 for count in self._failures.values() if count >= MAX_ATTEMPTS),
+        }
+
+
+derived_fields = DerivedFieldsUpdater()
@@ -0,0 +1,255 @@
+"""
+Background jobs for blog generation.
+
+POST /api/ai/generate-blog/jobs stores a `generation_jobs` row and returns
+its id at once; a bounded pool of asyncio workers (AI_JOB_WORKERS) picks
+jobs up, runs the same generation as the inline endpoint and records the
+outcome (status, blog id, message or error) on the row. Workers claim a job
+with a conditional UPDATE, so a job runs once even with several API
+processes. Jobs survive restarts: on startup, queued jobs and jobs left
+"running" by a dead process (older than AI_JOB_STALE_SECONDS) are queued
+again.
+"""
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+
+from . import models
+from .database import SessionLocal
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED = (DONE, FAILED)
+
+MAX_ATTEMPTS = 3
+
+
+def job_dict(job: models.GenerationJob) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "topic": job.topic,
+        "user_id": job.user_id,
+        "blog_id": job.blog_id,
+        "message": job.message,
+        "error": job.error,
+        "attempts": job.attempts or 0,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+class JobRunner:
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+        # job id -> Event set whenever that job's row changes (for subscribers)
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._handler: Optional[Callable[[models.GenerationJob], Awaitable[tuple]]] = None
+
+    def set_handler(self, handler: Callable[[models.GenerationJob], Awaitable[tuple]]):
+        """`handler(job)` generates and saves the post and returns (blog_id, message)."""
+        self._handler = handler
+
+    # --- persistence (runs in the threadpool) ---
+
+    def _by_key(self, db, idempotency_key: str):
+        return (
+            db.query(models.GenerationJob)
+            .filter(models.GenerationJob.idempotency_key == idempotency_key)
+            .first()
+        )
+
+    def _create(self, topic, length, language, user_id, idempotency_key):
+        db = SessionLocal()
+        try:
+            if idempotency_key:
+                existing = self._by_key(db, idempotency_key)
+                if existing:
+                    return job_dict(existing), False
+            job = models.GenerationJob(
+                id=uuid.uuid4().hex,
+                status=QUEUED,
+                topic=topic,
+                length=length,
+                language=language,
+                user_id=user_id,
+                idempotency_key=idempotency_key or None,
+                attempts=0,
+                created_at=datetime.now().isoformat(),
+            )
+            db.add(job)
+            try:
+                db.commit()
+            except IntegrityError:
+                # A concurrent retry with the same key inserted its job first: return that one
+                db.rollback()
+                existing = self._by_key(db, idempotency_key) if idempotency_key else None
+                if existing is None:
+                    raise
+                return job_dict(existing), False
+            return job_dict(job), True
+        finally:
+            db.close()
+
+    def _claim(self, job_id: str):
+        """Atomically move a queued job to running; returns the row, or None if someone else has it."""
+        db = SessionLocal()
+        try:
+            claimed = (
+                db.query(models.GenerationJob)
+                .filter(models.GenerationJob.id == job_id, models.GenerationJob.status == QUEUED)
+                .update(
+                    {
+                        "status": RUNNING,
+                        "started_at": datetime.now().isoformat(),
+                        "attempts": models.GenerationJob.attempts + 1,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            if not claimed:
+                return None
+            job = db.query(models.GenerationJob).filter(models.GenerationJob.id == job_id).first()
+            db.expunge(job)
+            return job
+        finally:
+            db.close()
+
+    def _finish(self, job_id: str, **fields):
+        db = SessionLocal()
+        try:
+            db.query(models.GenerationJob).filter(models.GenerationJob.id == job_id).update(
+                fields, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _recoverable(self):
+        stale_before = (
+            datetime.now() - timedelta(seconds=float(os.getenv("AI_JOB_STALE_SECONDS", "600")))
+        ).isoformat()
+        db = SessionLocal()
+        try:
+            Job = models.GenerationJob
+            # Running jobs that outlived their process go back to the queue
+            db.query(Job).filter(Job.status == RUNNING, Job.started_at < stale_before).update(
+                {"status": QUEUED}, synchronize_session=False
+            )
+            db.commit()
+            return [row.id for row in db.query(Job.id).filter(Job.status == QUEUED).order_by(Job.created_at)]
+        finally:
+            db.close()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        db = SessionLocal()
+        try:
+            job = db.query(models.GenerationJob).filter(models.GenerationJob.id == job_id).first()
+            return job_dict(job) if job else None
+        finally:
+            db.close()
+
+    # --- lifecycle ---
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        workers = int(os.getenv("AI_JOB_WORKERS", "4"))
+        self._workers = [asyncio.create_task(self._work()) for _ in range(workers)]
+        try:
+            pending = await run_in_threadpool(self._recoverable)
+        except Exception as e:
+            print(f"[jobs] Could not recover queued jobs: {e}")
+            pending = []
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        print(f"[jobs] {workers} generation workers started, {len(pending)} queued job(s) resumed")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, topic, length, language, user_id, idempotency_key=None) -> tuple:
+        """Store a new job (or return the one with the same idempotency key). Returns (job, created)."""
+        job, created = await run_in_threadpool(self._create, topic, length, language, user_id, idempotency_key)
+        if created and self._queue is not None:
+            self._queue.put_nowait(job["id"])
+        return job, created
+
+    async def wait_for_change(self, job_id: str, timeout: float):
+        event = self._changed.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _notify(self, job_id: str):
+        event = self._changed.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _work(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                print(f"[jobs] Worker error on {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = await run_in_threadpool(self._claim, job_id)
+        if job is None:
+            return
+        self._notify(job_id)
+        try:
+            blog_id, message = await self._handler(job)
+        except HTTPException as e:
+            if e.status_code == 429 and (job.attempts or 0) < MAX_ATTEMPTS:
+                # Scheduler is saturated: back off and try again later
+                await run_in_threadpool(self._finish, job_id, status=QUEUED)
+                self._notify(job_id)
+                retry_after = float((e.headers or {}).get("Retry-After", "5"))
+                asyncio.get_running_loop().call_later(retry_after, self._queue.put_nowait, job_id)
+                return
+            await self._fail(job_id, str(e.detail))
+            return
+        except Exception as e:
+            await self._fail(job_id, str(e))
+            return
+        await run_in_threadpool(
+            self._finish, job_id,
+            status=DONE, blog_id=blog_id, message=message, error=None,
+            finished_at=datetime.now().isoformat(),
+        )
+        self._notify(job_id)
+
+    async def _fail(self, job_id: str, error: str):
+        print(f"[jobs] Generation job {job_id} failed: {error}")
+        await run_in_threadpool(
+            self._finish, job_id, status=FAILED, error=error[:1000], finished_at=datetime.now().isoformat()
+        )
+        self._notify(job_id)
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._workers),
+            "queued_in_memory": self._queue.qsize() if self._queue is not None else 0,
+            "subscribers": len(self._changed),
+        }
+
+
+job_runner = JobRunner()
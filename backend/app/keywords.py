@@ -0,0 +1,273 @@
+"""
+Local keyword and keyphrase extraction (no network).
+
+Candidate phrases are RAKE-style: runs of up to three content words between
+stopwords and punctuation. Each word is weighted by how often it occurs in
+the text times its IDF over every blog post in the database, so words that
+are common on this site ("blog", "post") rank below what makes this text
+distinctive.
+
+Document frequencies are kept in `keyword_terms`: writers call
+sync_blog_words() / add_words_for_new_blogs() / remove_blog_words() in the
+same session as the blog change, so only the written post is tokenized.
+The IDF table used for scoring is an in-memory copy of that table, reloaded
+in a background thread when the blogs collection version changes.
+
+Used to pick image-search keywords without an LLM round trip and to tag
+generated posts automatically.
+"""
+import math
+import string
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from . import models
+from .conditional import get_collection_version
+from .database import SessionLocal
+from .summarizer import STOPWORDS, WORD_BREAKS
+
+MAX_PHRASE_WORDS = 3
+MIN_WORD_LENGTH = 3
+PHRASE_BONUS = 0.5
+
+# Punctuation ends a candidate phrase (words are split on it, as in summarizer.WORD_BREAKS)
+BREAK = "|"
+PHRASE_BREAKS = str.maketrans({c: f" {BREAK} " for c in string.punctuation + string.digits + "“”‘’–—…«»"})
+
+# How often the IDF table checks the blogs collection version for changes
+IDF_REFRESH_SECONDS = 300.0
+
+# Words per statement when adjusting keyword_terms (stays under SQLite's variable limit)
+WRITE_BATCH = 500
+
+# Words that carry no meaning on a blog platform, on top of the usual stopwords
+EXTRA_STOPWORDS = frozenset("""
+also best can complete could future get got guide introduction like make made many may might
+much must new one ones really shall thing things tips top ultimate use used using way ways well
+will within without would yet
+""".split())
+
+
+class CorpusIDF:
+    """Inverse document frequency of every word across all blog posts."""
+
+    def __init__(self):
+        self.idf: Dict[str, float] = {}
+        self.documents = 0
+        self.version: Optional[int] = None
+        self.built_at: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def weight(self, word: str) -> float:
+        """IDF of `word`; words never seen in the corpus get the maximum."""
+        weight = self.idf.get(word)
+        if weight is None:
+            return math.log(1 + self.documents) + 1.0
+        return weight
+
+    def maybe_refresh(self):
+        """Reload in the background if the blogs may have changed. Never blocks."""
+        now = time.monotonic()
+        with self._lock:
+            if self._refreshing or now - self._checked_at < IDF_REFRESH_SECONDS:
+                return
+            self._refreshing = True
+            self._checked_at = now
+        threading.Thread(target=self._refresh, name="corpus-idf", daemon=True).start()
+
+    def _refresh(self):
+        db = SessionLocal()
+        try:
+            version, _ = get_collection_version(db)
+            if version == self.version and self.built_at is not None:
+                return
+            documents = db.query(func.count(models.Blog.id)).scalar() or 0
+            rows = db.query(models.KeywordTerm.word, models.KeywordTerm.doc_count).filter(
+                models.KeywordTerm.doc_count > 0
+            )
+            self.idf = {
+                row.word: math.log((1 + documents) / (1 + row.doc_count)) + 1.0
+                for row in rows.yield_per(5000)
+            }
+            self.documents = documents
+            self.version = version
+            self.built_at = time.monotonic()
+            print(f"[Keywords] IDF table loaded for {documents} posts ({len(self.idf)} words)")
+        except Exception as e:
+            print(f"[Keywords] IDF table load failed: {e}")
+        finally:
+            db.close()
+            with self._lock:
+                self._refreshing = False
+
+
+corpus_idf = CorpusIDF()
+
+
+def _is_content_word(word: str) -> bool:
+    return len(word) >= MIN_WORD_LENGTH and word not in STOPWORDS and word not in EXTRA_STOPWORDS
+
+
+def words(text: str) -> List[str]:
+    """Lowercased content words of `text`."""
+    return [word for word in text.lower().translate(WORD_BREAKS).split() if _is_content_word(word)]
+
+
+def blog_words(title: Optional[str], content: Optional[str]) -> Set[str]:
+    """The distinct content words a post contributes to the document frequencies."""
+    return set(words(f"{title or ''} {content or ''}"))
+
+
+def _add_counts(db: Session, counts: Dict[str, int]):
+    """Add `counts` to keyword_terms.doc_count, creating missing words."""
+    items = list(counts.items())
+    for start in range(0, len(items), WRITE_BATCH):
+        statement = insert(models.KeywordTerm).values(
+            [{"word": word, "doc_count": count} for word, count in items[start:start + WRITE_BATCH]]
+        )
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["word"],
+            set_={"doc_count": models.KeywordTerm.doc_count + statement.excluded.doc_count},
+        ))
+
+
+def _remove_counts(db: Session, removed: Iterable[str]):
+    """Decrement each word once and drop the words no post contains any more."""
+    removed = list(removed)
+    Term = models.KeywordTerm
+    for start in range(0, len(removed), WRITE_BATCH):
+        batch = removed[start:start + WRITE_BATCH]
+        db.query(Term).filter(Term.word.in_(batch)).update(
+            {Term.doc_count: Term.doc_count - 1}, synchronize_session=False
+        )
+        db.query(Term).filter(Term.word.in_(batch), Term.doc_count <= 0).delete(synchronize_session=False)
+
+
+def sync_blog_words(db: Session, old_words: Set[str], new_words: Set[str]):
+    """Adjust document frequencies by the difference between a post's old and new words. Caller commits."""
+    added = new_words - old_words
+    removed = old_words - new_words
+    if removed:
+        _remove_counts(db, removed)
+    if added:
+        _add_counts(db, {word: 1 for word in added})
+
+
+def add_words_for_new_blogs(db: Session, blogs: Iterable):
+    """Bulk variant of sync_blog_words for freshly inserted blogs. Caller commits."""
+    counts: Counter = Counter()
+    for blog in blogs:
+        counts.update(blog_words(blog.title, blog.content))
+    if counts:
+        _add_counts(db, counts)
+
+
+def remove_blog_words(db: Session, blog):
+    """Take a deleted post's words out of the document frequencies. Caller commits."""
+    sync_blog_words(db, blog_words(blog.title, blog.content), set())
+
+
+def rebuild_keyword_index(db: Session, batch_size: int = 500) -> int:
+    """Rebuild keyword_terms from every post. Returns the number of blogs processed."""
+    db.query(models.KeywordTerm).delete(synchronize_session=False)
+
+    count = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(models.Blog.id, models.Blog.title, models.Blog.content)
+            .filter(models.Blog.id > last_id)
+            .order_by(models.Blog.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        add_words_for_new_blogs(db, batch)
+        count += len(batch)
+        last_id = batch[-1].id
+    db.commit()
+    return count
+
+
+def candidate_phrases(text: str) -> List[Tuple[str, ...]]:
+    """Runs of up to MAX_PHRASE_WORDS content words, split at stopwords and punctuation."""
+    phrases = []
+    run: List[str] = []
+    for token in text.lower().translate(PHRASE_BREAKS).split():
+        if token == BREAK or not _is_content_word(token):
+            if run:
+                phrases.append(tuple(run))
+            run = []
+            continue
+        run.append(token)
+        if len(run) == MAX_PHRASE_WORDS:
+            phrases.append(tuple(run))
+            run = []
+    if run:
+        phrases.append(tuple(run))
+    return phrases
+
+
+def keyphrases(text: str, limit: int = 5) -> List[Tuple[str, float]]:
+    """The `limit` best (phrase, score) pairs of `text`, best first."""
+    corpus_idf.maybe_refresh()
+    phrases = candidate_phrases(text or "")
+    if not phrases:
+        return []
+    frequency = Counter(word for phrase in phrases for word in phrase)
+    word_score = {word: (1.0 + math.log(count)) * corpus_idf.weight(word) for word, count in frequency.items()}
+
+    scored: Dict[Tuple[str, ...], float] = {}
+    for phrase, count in Counter(phrases).items():
+        mean = sum(word_score[word] for word in phrase) / len(phrase)
+        # Repeated multi-word phrases are strong keyphrases; one-off runs are not
+        scored[phrase] = mean * (1.0 + math.log(count)) * (1.0 + PHRASE_BONUS * (len(phrase) - 1) * (count > 1))
+    best = sorted(scored.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [(" ".join(phrase), round(score, 4)) for phrase, score in best]
+
+
+def best_keyword(text: str) -> Tuple[Optional[str], float]:
+    """The single most distinctive word of `text` and a confidence in [0, 1].
+
+    Confidence is how far the top word stands out from the next ones; a flat
+    ranking (short text, unknown corpus) scores low.
+    """
+    corpus_idf.maybe_refresh()
+    counts = Counter(words(text or ""))
+    if not counts:
+        return None, 0.0
+    ranked = sorted(
+        ((word, (1.0 + math.log(count)) * corpus_idf.weight(word)) for word, count in counts.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    top = [score for _, score in ranked[:3]]
+    if len(top) == 1:
+        return ranked[0][0], 1.0
+    confidence = (top[0] - sum(top[1:]) / len(top[1:])) / top[0]
+    return ranked[0][0], round(confidence, 4)
+
+
+def suggest_tags(text: str, limit: int = 3) -> List[str]:
+    """Tag names for a post: its top keyphrases in Title Case, skipping near-duplicates."""
+    picked: List[set] = []
+    tags = []
+    for phrase, _ in keyphrases(text, limit * 3):
+        phrase_words = set(phrase.split())
+        # "vegan recipes" adds nothing once "quick vegan recipes" is a tag, and vice versa
+        if any(phrase_words <= other or other <= phrase_words for other in picked):
+            continue
+        picked.append(phrase_words)
+        tags.append(phrase.title())
+        if len(tags) == limit:
+            break
+    return tags
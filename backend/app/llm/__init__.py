@@ -0,0 +1,3 @@
+"""
+Shared plumbing for calls to the hosted LLM providers (Groq, OpenAI).
+"""
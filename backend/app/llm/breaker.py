@@ -0,0 +1,178 @@
+"""
+Circuit breakers for upstream models.
+
+Each (provider, model) has a breaker that watches its recent calls. When
+enough calls in the window failed or were slow, the breaker opens and the
+gateway skips that model instantly (falling through to the next one, or to
+the handler's local fallback) instead of waiting for yet another timeout.
+While open, a background task pings the model after a cooldown: the breaker
+is half-open while the probe is in flight, closes if it succeeds and
+re-opens with a doubled cooldown if it fails. Real traffic never serves as
+the probe.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def counts_as_failure(error: BaseException) -> bool:
+    """Provider trouble (5xx, 429, timeouts, connection errors) trips a breaker; bad requests do not."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        return True
+    return status >= 500 or status in (408, 409, 429)
+
+
+class CircuitBreaker:
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+        self.state = CLOSED
+        self.cooldown = _env_float("AI_BREAKER_COOLDOWN_SECONDS", 30.0)
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.trips = 0
+        self.skipped = 0
+        self.probes = 0
+        # (monotonic time, failed, slow) for calls inside the window
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()
+        self._lock = threading.Lock()
+        self._probe: Optional[asyncio.Task] = None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            self.skipped += 1
+        # Open without a pending probe (e.g. it could not be scheduled): start one now
+        if self._probe is None or self._probe.done():
+            self._schedule_probe(delay=self._remaining_cooldown())
+        return False
+
+    def record(self, failed: bool, elapsed: float, error: Optional[BaseException] = None, slow: bool = False):
+        """Count one call. `slow` marks a call as slow whatever its elapsed time (e.g. abandoned unanswered)."""
+        now = time.monotonic()
+        slow = slow or elapsed >= _env_float("AI_BREAKER_SLOW_SECONDS", 20.0)
+        with self._lock:
+            if error is not None:
+                self.last_error = str(error)[:300]
+            self._outcomes.append((now, failed, slow))
+            window = _env_float("AI_BREAKER_WINDOW_SECONDS", 60.0)
+            while self._outcomes and self._outcomes[0][0] < now - window:
+                self._outcomes.popleft()
+            if self.state != CLOSED or len(self._outcomes) < _env_float("AI_BREAKER_MIN_CALLS", 5):
+                return
+            bad = sum(1 for _, f, s in self._outcomes if f or s)
+            if bad / len(self._outcomes) < _env_float("AI_BREAKER_FAILURE_RATE", 0.5):
+                return
+            self._trip()
+        print(f"[AI] Circuit opened for {self.provider}/{self.model}: {self.last_error}")
+        self._schedule_probe()
+
+    def _trip(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        self._outcomes.clear()
+
+    def _remaining_cooldown(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def _schedule_probe(self, delay: Optional[float] = None):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._probe is not None and not self._probe.done():
+            return
+        self._probe = loop.create_task(self._run_probe(self.cooldown if delay is None else delay))
+
+    async def _run_probe(self, delay: float):
+        from .clients import llm_clients
+
+        await asyncio.sleep(delay)
+        client = llm_clients.get(self.provider)
+        if client is None:
+            return
+        with self._lock:
+            self.state = HALF_OPEN
+            self.probes += 1
+        try:
+            # One-token ping; small enough to skip the scheduler's rate limits
+            await client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": "ping"}],
+                max_tokens=1,
+            )
+        except Exception as e:
+            with self._lock:
+                self.last_error = str(e)[:300]
+                self.cooldown = min(self.cooldown * 2, _env_float("AI_BREAKER_MAX_COOLDOWN_SECONDS", 300.0))
+                self._trip()
+            self._probe = None
+            self._schedule_probe()
+            return
+        with self._lock:
+            self.state = CLOSED
+            self.opened_at = None
+            self.cooldown = _env_float("AI_BREAKER_COOLDOWN_SECONDS", 30.0)
+        print(f"[AI] Circuit closed for {self.provider}/{self.model}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = sum(1 for _, f, _ in self._outcomes if f)
+            slow = sum(1 for _, _, s in self._outcomes if s)
+            return {
+                "state": self.state,
+                "window_calls": calls,
+                "window_failures": failures,
+                "window_slow": slow,
+                "trips": self.trips,
+                "skipped": self.skipped,
+                "probes": self.probes,
+                "cooldown_seconds": self.cooldown,
+                "open_for_seconds": round(time.monotonic() - self.opened_at, 1) if self.opened_at else None,
+                "last_error": self.last_error,
+            }
+
+
+class BreakerBoard:
+    def __init__(self):
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str, model: str) -> CircuitBreaker:
+        key = (provider, model)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(key, CircuitBreaker(provider, model))
+        return breaker
+
+    def allow(self, provider: str, model: str) -> bool:
+        return self.get(provider, model).allow()
+
+    def stats(self) -> dict:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {f"{b.provider}/{b.model}": b.stats() for b in breakers}
+
+
+breakers = BreakerBoard()
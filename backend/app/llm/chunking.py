@@ -0,0 +1,102 @@
+"""
+Split long markdown into chunks that fit a prompt token budget.
+
+Every markdown heading starts a new chunk. A section over the budget is cut
+at blank-line paragraphs, then sentences, and only as a last resort at a
+fixed character width, and those pieces are packed back together up to the
+budget. Because chunks never span headings, editing one section leaves the
+chunks of every other section byte-identical, which keeps their cached
+summaries valid.
+
+split_paragraphs() is the finer, lossless split used by the per-paragraph
+tools (translation, grammar checking): it keeps the separators so results
+can be stitched back into the original layout.
+"""
+import hashlib
+import re
+from typing import List, Tuple
+
+# Same rough rate the scheduler uses for prompt text
+CHARS_PER_TOKEN = 4
+
+HEADING_RE = re.compile(r"^(?=#{1,6}\s)", re.MULTILINE)
+PARAGRAPH_RE = re.compile(r"\n\s*\n")
+PARAGRAPH_BREAK_RE = re.compile(r"(\n[ \t]*\n\s*)")
+LONE_HEADING_RE = re.compile(r"^#{1,6}\s")
+FENCE = "```"
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def count_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+def _split(text: str, pattern: re.Pattern) -> List[str]:
+    return [piece.strip() for piece in pattern.split(text) if piece.strip()]
+
+
+def _pieces(text: str, max_tokens: int, level: int = 0) -> List[str]:
+    """Break `text` into pieces no larger than the budget, preferring coarse boundaries."""
+    if count_tokens(text) <= max_tokens:
+        return [text]
+    patterns = (PARAGRAPH_RE, SENTENCE_RE)
+    if level >= len(patterns):
+        width = max_tokens * CHARS_PER_TOKEN
+        return [text[i:i + width] for i in range(0, len(text), width)]
+    parts = _split(text, patterns[level])
+    if len(parts) <= 1:
+        return _pieces(text, max_tokens, level + 1)
+    pieces = []
+    for part in parts:
+        pieces.extend(_pieces(part, max_tokens, level + 1))
+    return pieces
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """Split `text` into chunks of at most `max_tokens` (estimated), in order."""
+    text = text.strip()
+    if not text:
+        return []
+    chunks: List[str] = []
+    for section in _split(text, HEADING_RE):
+        current = ""
+        for piece in _pieces(section, max_tokens):
+            candidate = f"{current}\n\n{piece}" if current else piece
+            if current and count_tokens(candidate) > max_tokens:
+                chunks.append(current)
+                current = piece
+            else:
+                current = candidate
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def paragraph_hash(paragraph: str) -> str:
+    return hashlib.sha256(paragraph.encode("utf-8")).hexdigest()
+
+
+def split_paragraphs(text: str) -> List[Tuple[str, str]]:
+    """Split text into (paragraph, following separator) pairs; joining them gives back `text`.
+
+    A fenced code block stays in one paragraph, and a heading is kept with the
+    paragraph after it so it is processed in context.
+    """
+    parts = PARAGRAPH_BREAK_RE.split(text or "")
+    pairs = []
+    for i in range(0, len(parts), 2):
+        paragraph = parts[i].rstrip()
+        # Trailing whitespace (end of text) belongs to the separator, not the paragraph
+        pairs.append((paragraph, parts[i][len(paragraph):] + (parts[i + 1] if i + 1 < len(parts) else "")))
+
+    merged: List[Tuple[str, str]] = []
+    for paragraph, separator in pairs:
+        if merged:
+            previous, previous_separator = merged[-1]
+            inside_fence = previous.count(FENCE) % 2 == 1
+            lone_heading = LONE_HEADING_RE.match(previous) and "\n" not in previous.strip()
+            if inside_fence or lone_heading:
+                merged[-1] = (previous + previous_separator + paragraph, separator)
+                continue
+        merged.append((paragraph, separator))
+    return merged
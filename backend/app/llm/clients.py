@@ -0,0 +1,223 @@
+"""
+Process-wide registry of LLM provider clients.
+
+Each provider's SDK client is built once (at startup, or on first use) and
+every client shares one tuned httpx connection pool, so AI calls reuse warm
+keep-alive connections instead of paying a TLS handshake per request. The
+registry re-reads the environment on each lookup and rebuilds a client only
+when its configuration actually changed (e.g. a rotated API key).
+"""
+import hashlib
+import importlib.util
+import os
+import threading
+from collections import Counter
+from typing import Callable, Dict, Optional, Tuple
+
+import httpx
+from groq import AsyncGroq
+from openai import AsyncOpenAI
+
+# provider -> (SDK client class, API key variable, base URL variable)
+PROVIDERS = {
+    "groq": (AsyncGroq, "GROQ_API_KEY", "GROQ_BASE_URL"),
+    "openai": (AsyncOpenAI, "OPENAI_API_KEY", "OPENAI_BASE_URL"),
+}
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _pool_config() -> Tuple:
+    return (
+        _env_int("LLM_MAX_CONNECTIONS", 200),
+        _env_int("LLM_MAX_KEEPALIVE_CONNECTIONS", 50),
+        _env_float("LLM_KEEPALIVE_EXPIRY_SECONDS", 120.0),
+        _env_float("LLM_TIMEOUT_SECONDS", 60.0),
+        HTTP2_AVAILABLE and os.getenv("LLM_HTTP2", "1") != "0",
+    )
+
+
+def _provider_config(provider: str) -> Tuple:
+    _, key_var, url_var = PROVIDERS[provider]
+    return (os.getenv(key_var) or None, os.getenv(url_var) or None, _env_int("LLM_MAX_RETRIES", 2))
+
+
+def _fingerprint(config: Tuple) -> str:
+    # Keep API keys out of memory dumps of the registry state
+    return hashlib.sha1(repr(config).encode("utf-8")).hexdigest()
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response body that reports once when it is closed (read to the end, or abandoned)."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+                self._on_close = None
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    """Wraps the pool's transport to count requests in flight and responses per HTTP version.
+
+    Only public httpx transport API is used, so the numbers survive httpx/httpcore upgrades
+    (the pool's own connection list is private).
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, registry: "ClientRegistry"):
+        self._transport = transport
+        self._registry = registry
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        registry = self._registry
+        registry.in_flight += 1
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            registry.in_flight -= 1
+            raise
+        version = response.extensions.get("http_version", b"HTTP/1.1")
+        registry.http_versions[version.decode("ascii", "replace")] += 1
+
+        def finished():
+            registry.in_flight -= 1
+
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_TrackedStream(response.stream, finished),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class ClientRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._http_fingerprint: Optional[str] = None
+        self._clients: Dict[str, object] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self.builds = 0
+        self.reloads = 0
+        self.requests = 0
+        # Upstream requests sent and not yet fully read, and responses by HTTP version (_CountingTransport)
+        self.in_flight = 0
+        self.http_versions: Counter = Counter()
+
+    async def _count_request(self, request: httpx.Request):
+        self.requests += 1
+
+    def _build_http(self, config: Tuple) -> httpx.AsyncClient:
+        max_connections, max_keepalive, keepalive_expiry, timeout, http2 = config
+        transport = httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+        return httpx.AsyncClient(
+            transport=_CountingTransport(transport, self),
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            event_hooks={"request": [self._count_request]},
+        )
+
+    def _ensure_http(self) -> httpx.AsyncClient:
+        """The shared pool; rebuilt (with every client on it) when pool settings change."""
+        fingerprint = _fingerprint(_pool_config())
+        if self._http is not None and not self._http.is_closed and fingerprint == self._http_fingerprint:
+            return self._http
+        # Connections on the old pool are left to drain; in-flight calls keep their reference
+        self._http = self._build_http(_pool_config())
+        self._http_fingerprint = fingerprint
+        self._clients.clear()
+        self._fingerprints.clear()
+        return self._http
+
+    def get(self, provider: str):
+        """Return the provider's shared client, or None if it is not configured."""
+        config = _provider_config(provider)
+        api_key = config[0]
+        if not api_key:
+            return None
+        fingerprint = _fingerprint(config)
+        with self._lock:
+            http = self._ensure_http()
+            client = self._clients.get(provider)
+            if client is not None and self._fingerprints.get(provider) == fingerprint:
+                return client
+            client_cls, _, _ = PROVIDERS[provider]
+            try:
+                client = client_cls(api_key=api_key, base_url=config[1], max_retries=config[2], http_client=http)
+            except Exception as e:
+                print(f"[AI] Error creating {provider} client: {e}")
+                return None
+            if provider in self._clients:
+                self.reloads += 1
+                print(f"[AI] {provider} configuration changed, client rebuilt")
+            self.builds += 1
+            self._clients[provider] = client
+            self._fingerprints[provider] = fingerprint
+            return client
+
+    async def startup(self):
+        """Build every configured client up front so the first AI request is not slower."""
+        configured = [provider for provider in PROVIDERS if self.get(provider) is not None]
+        http2 = bool(self._http is not None and _pool_config()[4])
+        print(f"[AI] LLM clients ready: {', '.join(configured) or 'none'} (http2={http2})")
+
+    async def shutdown(self):
+        with self._lock:
+            http, self._http = self._http, None
+            self._clients.clear()
+            self._fingerprints.clear()
+        if http is not None:
+            await http.aclose()
+
+    def stats(self) -> dict:
+        with self._lock:
+            providers = sorted(self._clients)
+        max_connections, max_keepalive, keepalive_expiry, timeout, http2_enabled = _pool_config()
+        return {
+            "providers": providers,
+            "builds": self.builds,
+            "reloads": self.reloads,
+            "requests": self.requests,
+            "in_flight_requests": self.in_flight,
+            "responses_by_http_version": dict(self.http_versions),
+            "http2_enabled": http2_enabled,
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive,
+            "keepalive_expiry_seconds": keepalive_expiry,
+        }
+
+
+llm_clients = ClientRegistry()
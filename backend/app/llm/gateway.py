@@ -0,0 +1,192 @@
+"""
+Single entry point for chat completions.
+
+complete() tries a chain of (provider, model) pairs and returns the first
+answer. With hedging on, a slow attempt does not have to fail before the
+next model is tried: once it exceeds its p95-derived hedge delay the next
+model is fired alongside it, the first answer wins and the loser is
+cancelled. Models whose circuit breaker is open are skipped without a call,
+and every call that does go out first waits its turn in the scheduler.
+Tools that opted into the response cache are answered from it
+when the same request was seen before, and identical requests that arrive
+while one is already in flight share its upstream call.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .breaker import breakers, counts_as_failure
+from .clients import llm_clients
+from .hedging import hedging_enabled, latency
+from .response_cache import request_key, response_cache, wants_bypass
+from .scheduler import admitted_var, caller_var, estimate_tokens, scheduler
+from .singleflight import single_flight
+
+PROVIDER_NAMES = {"groq": "Groq", "openai": "OpenAI"}
+
+# Model chains shared by several tools: fast Groq model first, OpenAI as backup
+FAST_CHAIN = (("groq", "llama-3.1-8b-instant"), ("openai", "gpt-3.5-turbo"))
+GROQ_LARGE = (("groq", "llama-3.3-70b-versatile"),)
+
+# A single list of messages for every provider, or one list per provider
+Messages = Union[List[dict], Dict[str, List[dict]]]
+
+
+class LLMUnavailable(Exception):
+    """No provider in the chain is configured, or every one of them failed."""
+
+
+@dataclass
+class Completion:
+    text: str
+    provider: str
+    model: str
+    cached: bool = False
+
+    @property
+    def provider_name(self) -> str:
+        return PROVIDER_NAMES.get(self.provider, self.provider)
+
+    @property
+    def label(self) -> str:
+        return f"{self.provider_name} ({self.model})"
+
+
+def _messages_for(messages: Messages, provider: str) -> List[dict]:
+    return messages[provider] if isinstance(messages, dict) else messages
+
+
+async def _attempt(
+    tool: str, client, provider: str, model: str, messages: List[dict], params: dict, caller: str, priority
+) -> Completion:
+    estimated = estimate_tokens(messages, params.get("max_tokens"))
+    await scheduler.acquire(provider, tool, caller, estimated, priority)
+    breaker = breakers.get(provider, model)
+    started = time.perf_counter()
+    try:
+        resp = await client.chat.completions.create(model=model, messages=messages, **params)
+    except asyncio.CancelledError:
+        # Lost a hedge race. Cancelled past its hedge delay, it had already outrun its p95 without
+        # answering: count it as slow, or a hung model (always cancelled before
+        # AI_BREAKER_SLOW_SECONDS) would never trip its breaker. Cancelled sooner, it says nothing.
+        elapsed = time.perf_counter() - started
+        delay = latency.hedge_delay(tool, provider, model)
+        if delay is not None and elapsed >= delay:
+            breaker.record(False, elapsed, TimeoutError(f"No answer after {elapsed:.1f}s (hedged)"), slow=True)
+        raise
+    except Exception as e:
+        breaker.record(counts_as_failure(e), time.perf_counter() - started, e)
+        raise
+    elapsed = time.perf_counter() - started
+    breaker.record(False, elapsed)
+    latency.record(tool, provider, model, elapsed)
+    scheduler.settle(provider, estimated, getattr(getattr(resp, "usage", None), "total_tokens", None))
+    return Completion(resp.choices[0].message.content or "", provider, model)
+
+
+async def _call_chain(
+    tool: str, chain: Sequence[Tuple[str, str]], messages: Messages, params: dict, caller: str, priority
+) -> Completion:
+    configured = [
+        (provider, model, client)
+        for provider, model in chain
+        if (client := llm_clients.get(provider)) is not None
+    ]
+    if not configured:
+        raise LLMUnavailable("No AI provider configured")
+    attempts = [attempt for attempt in configured if breakers.allow(attempt[0], attempt[1])]
+    if not attempts:
+        raise LLMUnavailable("AI providers are temporarily unavailable (circuit open)")
+
+    hedge = hedging_enabled()
+    running: Dict[asyncio.Task, Tuple[str, str]] = {}
+    next_index = 0
+    hedged = False
+    last_error = None
+
+    def launch():
+        nonlocal next_index
+        provider, model, client = attempts[next_index]
+        next_index += 1
+        task = asyncio.ensure_future(
+            _attempt(tool, client, provider, model, _messages_for(messages, provider), params, caller, priority)
+        )
+        running[task] = (provider, model)
+        return provider, model
+
+    try:
+        current = launch()
+        while running:
+            timeout = None
+            if hedge and next_index < len(attempts):
+                timeout = latency.hedge_delay(tool, *current)
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # The current attempt is slower than its p95: fire the next model alongside it
+                latency.record_hedge()
+                hedged = True
+                current = launch()
+                continue
+            for task in done:
+                provider, model = running.pop(task)
+                error = task.exception()
+                if error is None:
+                    latency.record_win(provider, model, hedged)
+                    return task.result()
+                print(f"[AI] {PROVIDER_NAMES.get(provider, provider)} error in {tool}: {error}")
+                last_error = error
+            if not running and next_index < len(attempts):
+                current = launch()
+    finally:
+        for task in running:
+            task.cancel()
+    raise LLMUnavailable(str(last_error)) from last_error
+
+
+async def complete(
+    tool: str,
+    chain: Sequence[Tuple[str, str]],
+    messages: Messages,
+    *,
+    headers=None,
+    caller: Optional[str] = None,
+    priority: Optional[int] = None,
+    **params,
+) -> Completion:
+    """Run a chat completion for `tool`, falling back (or hedging) along `chain`.
+
+    `messages` is one list for every provider, or a dict of lists keyed by
+    provider. `headers` are the incoming request's headers, used to honour
+    the cache bypass header. `caller` and `priority` place the call in the
+    scheduler (defaulting to the request's caller and the tool's class).
+    Raises LLMUnavailable when no provider produced an answer, and QueueFull
+    (a 429) when the scheduler is too backed up to take the request. Work
+    that already holds an admission (admitted_var) is not admitted again.
+    """
+    caller = caller or caller_var.get()
+    key = request_key(tool, chain, messages, params)
+    cacheable = response_cache.enabled_for(tool)
+    if cacheable:
+        if wants_bypass(headers):
+            response_cache.bypasses += 1
+        else:
+            hit = await response_cache.get(key)
+            if hit is not None:
+                text, provider, model = hit
+                return Completion(text, provider, model, cached=True)
+
+    admitted = admitted_var.get()
+    if not admitted:
+        scheduler.admit(caller)
+
+    async def call():
+        result = await _call_chain(tool, chain, messages, params, caller, priority)
+        if cacheable:
+            await response_cache.set(key, tool, result.text, result.provider, result.model)
+        return result
+
+    # The slot is held until the upstream call finishes, not just while this caller waits for it:
+    # a leader whose client disconnects leaves the call running (and using provider capacity)
+    release = None if admitted else (lambda _task: scheduler.release(caller))
+    return await single_flight.do(key, tool, call, on_done=release)
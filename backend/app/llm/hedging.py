@@ -0,0 +1,112 @@
+"""
+Latency tracking and hedge delays.
+
+Every successful upstream call records its latency per (tool, provider,
+model). When hedging is on, the gateway waits hedge_delay() for the current
+attempt before firing the next model in the chain alongside it, and takes
+whichever answers first. The delay is the observed p95 (AI_HEDGE_PERCENTILE)
+for that tool and model, at least AI_HEDGE_MIN_DELAY; until enough samples
+exist, AI_HEDGE_DEFAULT_DELAY is used. A model whose p95 is above the
+tool's maximum delay (AI_HEDGE_MAX_DELAY by default) is not hedged at all:
+its normal answers take that long, so hedging would duplicate most calls.
+Long, expensive tools (TOOL_HEDGE_LIMITS) have their own maximum and are
+not hedged until their p95 is known.
+"""
+import math
+import os
+import threading
+from collections import Counter, deque
+from typing import Deque, Dict, Optional, Tuple
+
+SAMPLE_WINDOW = 200
+MIN_SAMPLES = 20
+
+# Per-tool (default delay, max delay) in seconds. A None default means no hedging until
+# MIN_SAMPLES latencies are recorded, so a cold start never duplicates a long paid call.
+TOOL_HEDGE_LIMITS: Dict[str, Tuple[Optional[float], float]] = {
+    "generate_blog": (None, 60.0),
+    "image_caption": (None, 30.0),
+    "image_analyzer": (None, 30.0),
+}
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def hedging_enabled() -> bool:
+    return os.getenv("AI_HEDGING", "1") != "0"
+
+
+class LatencyTracker:
+    def __init__(self):
+        self._samples: Dict[Tuple[str, str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+        self.hedges = 0
+        self.hedge_wins: Counter = Counter()
+
+    def record(self, tool: str, provider: str, model: str, seconds: float):
+        key = (tool, provider, model)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=SAMPLE_WINDOW)
+            samples.append(seconds)
+
+    def percentile(self, tool: str, provider: str, model: str, pct: float):
+        """The pct-th percentile latency in seconds, or None with too few samples."""
+        with self._lock:
+            samples = sorted(self._samples.get((tool, provider, model), ()))
+        if len(samples) < MIN_SAMPLES:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(pct / 100 * len(samples)) - 1))
+        return samples[index]
+
+    def hedge_delay(self, tool: str, provider: str, model: str) -> Optional[float]:
+        """Seconds to wait before hedging a call to this model, or None to not hedge it."""
+        default, high = TOOL_HEDGE_LIMITS.get(
+            tool, (_env_float("AI_HEDGE_DEFAULT_DELAY", 3.0), _env_float("AI_HEDGE_MAX_DELAY", 15.0))
+        )
+        observed = self.percentile(tool, provider, model, _env_float("AI_HEDGE_PERCENTILE", 95))
+        if observed is None:
+            return default
+        if observed > high:
+            return None
+        return max(observed, _env_float("AI_HEDGE_MIN_DELAY", 0.5))
+
+    def record_hedge(self):
+        self.hedges += 1
+
+    def record_win(self, provider: str, model: str, hedged: bool):
+        if hedged:
+            self.hedge_wins[f"{provider}/{model}"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            keys = list(self._samples)
+        pct = _env_float("AI_HEDGE_PERCENTILE", 95)
+        models = {}
+        for tool, provider, model in keys:
+            with self._lock:
+                count = len(self._samples[(tool, provider, model)])
+            p50 = self.percentile(tool, provider, model, 50)
+            p95 = self.percentile(tool, provider, model, pct)
+            delay = self.hedge_delay(tool, provider, model)
+            models[f"{tool}:{provider}/{model}"] = {
+                "samples": count,
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                f"p{pct:g}_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None,
+            }
+        return {
+            "enabled": hedging_enabled(),
+            "hedges": self.hedges,
+            "hedge_wins": dict(self.hedge_wins),
+            "models": models,
+        }
+
+
+latency = LatencyTracker()
@@ -0,0 +1,220 @@
+"""
+Persistent, content-addressed cache for AI tool responses.
+
+Entries live in the `ai_response_cache` table, keyed by a hash of the tool,
+the model chain, the prompt messages and the sampling parameters, so the
+same input to the same tool is answered without an upstream call (and
+survives restarts). A small in-memory LRU (app.cache.TTLCache) sits in
+front so hot entries never touch SQLite. Expired rows are dropped lazily,
+and the table is trimmed to AI_CACHE_MAX_ENTRIES / AI_CACHE_MAX_BYTES,
+least recently used first.
+
+Caching is opt-in per tool: only tools listed in TOOL_TTLS (and, if set,
+in the AI_CACHE_TOOLS environment variable) are cached.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Sequence, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+
+from .. import models
+from ..cache import TTLCache
+from ..database import SessionLocal
+
+DAY = 24 * 60 * 60
+
+# Tools whose responses may be cached, with how long an entry stays valid
+TOOL_TTLS = {
+    "summarize": 7 * DAY,
+    # Sections of long posts, keyed by the section text alone (see routes.ai.map_reduce_summary)
+    "summarize_chunk": 30 * DAY,
+    "headline": 7 * DAY,
+    "translate": 30 * DAY,
+    "change_tone": 7 * DAY,
+    "grammar_check": 30 * DAY,
+    "plagiarism_check": 7 * DAY,
+}
+
+# Request headers that skip the cache lookup (the fresh answer is still stored)
+BYPASS_HEADER = "x-ai-cache"
+BYPASS_VALUES = ("bypass", "refresh", "no-cache")
+
+
+def _enabled_tools() -> frozenset:
+    configured = os.getenv("AI_CACHE_TOOLS")
+    if configured is None:
+        return frozenset(TOOL_TTLS)
+    return frozenset(tool.strip() for tool in configured.split(",") if tool.strip()) & frozenset(TOOL_TTLS)
+
+
+def request_key(tool: str, chain: Sequence[Tuple[str, str]], messages: list, params: dict) -> str:
+    """Content address of an AI request: identical inputs give identical keys."""
+    raw = json.dumps(
+        {"tool": tool, "models": [list(pair) for pair in chain], "messages": messages, "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def wants_bypass(headers) -> bool:
+    """True when the caller asked for a fresh answer (X-AI-Cache: bypass, or Cache-Control: no-cache)."""
+    if headers is None:
+        return False
+    if (headers.get(BYPASS_HEADER) or "").strip().lower() in BYPASS_VALUES:
+        return True
+    return "no-cache" in (headers.get("cache-control") or "").lower()
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int, max_bytes: int, memory_entries: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory = TTLCache(max_entries=memory_entries, ttl_seconds=DAY)
+        self.enabled_tools = _enabled_tools()
+        self._lock = threading.Lock()
+        self._writes_since_trim = 0
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def enabled_for(self, tool: str) -> bool:
+        return tool in self.enabled_tools
+
+    async def get(self, key: str) -> Optional[Tuple[str, str, str]]:
+        """Return (text, provider, model) for a live entry, or None."""
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            self.memory_hits += 1
+            return value
+        value = await run_in_threadpool(self._load, key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        text, provider, model, ttl_left = value
+        self.memory.set(key, (text, provider, model), ttl=min(ttl_left, self.memory.ttl_seconds))
+        return text, provider, model
+
+    async def set(self, key: str, tool: str, text: str, provider: str, model: str):
+        ttl = TOOL_TTLS.get(tool, DAY)
+        self.memory.set(key, (text, provider, model), ttl=min(ttl, self.memory.ttl_seconds))
+        await run_in_threadpool(self._store, key, tool, text, provider, model, ttl)
+
+    def _load(self, key: str):
+        db = SessionLocal()
+        try:
+            entry = db.query(models.AIResponseCache).filter(models.AIResponseCache.key == key).first()
+            if entry is None:
+                return None
+            now = datetime.now()
+            if entry.expires_at and entry.expires_at <= now.isoformat():
+                db.delete(entry)
+                db.commit()
+                return None
+            entry.hits = (entry.hits or 0) + 1
+            entry.last_used_at = now.isoformat()
+            db.commit()
+            ttl_left = (datetime.fromisoformat(entry.expires_at) - now).total_seconds() if entry.expires_at else DAY
+            return entry.response, entry.provider, entry.model, max(ttl_left, 1.0)
+        except Exception as e:
+            print(f"[AI cache] Lookup failed: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _store(self, key, tool, text, provider, model, ttl):
+        db = SessionLocal()
+        try:
+            now = datetime.now()
+            db.merge(models.AIResponseCache(
+                key=key,
+                tool=tool,
+                provider=provider,
+                model=model,
+                response=text,
+                size=len(text.encode("utf-8")),
+                hits=0,
+                created_at=now.isoformat(),
+                last_used_at=now.isoformat(),
+                expires_at=(now + timedelta(seconds=ttl)).isoformat(),
+            ))
+            db.commit()
+            self.stores += 1
+            with self._lock:
+                self._writes_since_trim += 1
+                trim = self._writes_since_trim >= 50
+                if trim:
+                    self._writes_since_trim = 0
+            if trim:
+                self._trim(db)
+        except Exception as e:
+            db.rollback()
+            print(f"[AI cache] Store failed: {e}")
+        finally:
+            db.close()
+
+    def _trim(self, db):
+        """Drop expired rows, then least recently used rows until under both limits."""
+        Entry = models.AIResponseCache
+        removed = db.query(Entry).filter(Entry.expires_at <= datetime.now().isoformat()).delete(synchronize_session=False)
+        count, size = db.query(func.count(Entry.key), func.coalesce(func.sum(Entry.size), 0)).one()
+        doomed = []
+        if count > self.max_entries or size > self.max_bytes:
+            for key, entry_size in db.query(Entry.key, Entry.size).order_by(Entry.last_used_at).yield_per(500):
+                if count <= self.max_entries and size <= self.max_bytes:
+                    break
+                doomed.append(key)
+                count -= 1
+                size -= entry_size or 0
+        if doomed:
+            db.query(Entry).filter(Entry.key.in_(doomed)).delete(synchronize_session=False)
+        db.commit()
+        if removed or doomed:
+            self.evictions += removed + len(doomed)
+            self.memory.invalidate(*doomed)
+
+    def stats(self) -> dict:
+        db = SessionLocal()
+        try:
+            count, size = db.query(
+                func.count(models.AIResponseCache.key),
+                func.coalesce(func.sum(models.AIResponseCache.size), 0),
+            ).one()
+        except Exception:
+            count, size = 0, 0
+        finally:
+            db.close()
+        lookups = self.hits + self.misses
+        return {
+            "tools": sorted(self.enabled_tools),
+            "entries": count,
+            "bytes": size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "bypasses": self.bypasses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "memory": self.memory.stats(),
+        }
+
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("AI_CACHE_MAX_ENTRIES", "20000")),
+    max_bytes=int(os.getenv("AI_CACHE_MAX_BYTES", str(200 * 1024 * 1024))),
+    memory_entries=int(os.getenv("AI_CACHE_MEMORY_ENTRIES", "512")),
+)
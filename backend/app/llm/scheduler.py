@@ -0,0 +1,285 @@
+"""
+Central scheduler for upstream AI calls.
+
+Every call waits here for its provider's token buckets (requests per minute
+and estimated tokens per minute) before it goes out, so bursts queue up in
+the API instead of tripping the provider's rate limits. Waiting calls are
+served by priority class first (interactive tools before bulk generation),
+then round-robin across callers, so one user's bulk run cannot starve
+everyone else. When too many requests are already outstanding (in total,
+or for one caller), new work is rejected up front with 429 and a
+Retry-After estimate.
+
+Callers are identified by user id where the request carries one, otherwise
+by client address (set per request through `caller_var`).
+"""
+import asyncio
+import math
+import os
+import time
+from collections import Counter, OrderedDict, deque
+from contextvars import ContextVar
+from typing import Deque, Dict, Optional
+
+from fastapi import HTTPException
+
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+# Tools that are not someone waiting on an editor button
+TOOL_PRIORITIES = {
+    "generate_blog": BULK,
+}
+
+# Per-minute limits used when <PROVIDER>_RPM / <PROVIDER>_TPM are not set
+DEFAULT_LIMITS = {
+    "groq": (30, 20000),
+    "openai": (500, 200000),
+}
+
+caller_var: ContextVar[str] = ContextVar("ai_caller", default="anonymous")
+# Overrides the tool's class for work done on someone's behalf in bulk (e.g. batch items)
+priority_var: ContextVar[Optional[int]] = ContextVar("ai_priority", default=None)
+# Set inside work that already holds an admission (a batch item), so the calls it
+# fans out to (paragraphs, summary chunks) are not counted against the caller again
+admitted_var: ContextVar[bool] = ContextVar("ai_admitted", default=False)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def estimate_tokens(messages, max_tokens: Optional[int]) -> int:
+    """Rough upstream token cost: ~4 characters per prompt token plus the completion budget."""
+    chars = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(content, list):
+            # Images are billed per tile, not per base64 character
+            chars += sum(len(part.get("text", "")) for part in content if isinstance(part, dict))
+            chars += 4000 * sum(1 for part in content if isinstance(part, dict) and part.get("type") == "image_url")
+    return chars // 4 + (max_tokens or 1000)
+
+
+class QueueFull(HTTPException):
+    def __init__(self, retry_after: int, reason: str):
+        super().__init__(
+            status_code=429,
+            detail=f"AI queue is full ({reason}). Please retry in {retry_after} seconds.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class TokenBucket:
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, cost: float) -> float:
+        """Seconds until `cost` is available (0 if it is now)."""
+        self._refill()
+        cost = min(cost, self.capacity)
+        if self.level >= cost:
+            return 0.0
+        return (cost - self.level) / self.rate if self.rate else math.inf
+
+    def take(self, cost: float):
+        self._refill()
+        self.level -= min(cost, self.capacity)
+
+    def adjust(self, delta: float):
+        """Charge (positive) or refund (negative) the difference between estimated and actual cost."""
+        self._refill()
+        self.level = min(self.capacity, self.level - delta)
+
+
+class _Waiter:
+    __slots__ = ("future", "tokens", "enqueued", "caller", "priority")
+
+    def __init__(self, future, tokens, caller, priority):
+        self.future = future
+        self.tokens = tokens
+        self.caller = caller
+        self.priority = priority
+        self.enqueued = time.monotonic()
+
+
+class ProviderQueue:
+    def __init__(self, provider: str):
+        rpm, tpm = DEFAULT_LIMITS.get(provider, (60, 60000))
+        self.requests = TokenBucket(_env_int(f"{provider.upper()}_RPM", rpm))
+        self.tokens = TokenBucket(_env_int(f"{provider.upper()}_TPM", tpm))
+        # priority -> caller -> FIFO of waiters; caller order rotates for round-robin
+        self.waiting: Dict[int, "OrderedDict[str, Deque[_Waiter]]"] = {INTERACTIVE: OrderedDict(), BULK: OrderedDict()}
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def depth(self) -> int:
+        return sum(len(q) for callers in self.waiting.values() for q in callers.values())
+
+    def head(self) -> Optional[_Waiter]:
+        for priority in sorted(self.waiting):
+            for queue in self.waiting[priority].values():
+                if queue:
+                    return queue[0]
+        return None
+
+    def pop(self, waiter: _Waiter):
+        callers = self.waiting[waiter.priority]
+        queue = callers[waiter.caller]
+        queue.popleft()
+        # Served: this caller goes to the back of the round
+        del callers[waiter.caller]
+        if queue:
+            callers[waiter.caller] = queue
+
+    def remove(self, waiter: _Waiter):
+        queue = self.waiting[waiter.priority].get(waiter.caller)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            return
+        if not queue:
+            del self.waiting[waiter.priority][waiter.caller]
+
+
+class Scheduler:
+    def __init__(self):
+        self._queues: Dict[str, ProviderQueue] = {}
+        # Admitted requests not yet finished, per caller (queued or running upstream)
+        self._outstanding: Counter = Counter()
+        self.granted: Counter = Counter()
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _queue(self, provider: str) -> ProviderQueue:
+        queue = self._queues.get(provider)
+        if queue is None:
+            queue = self._queues[provider] = ProviderQueue(provider)
+        return queue
+
+    def priority_for(self, tool: str) -> int:
+        override = priority_var.get()
+        if override is not None:
+            return override
+        return TOOL_PRIORITIES.get(tool, INTERACTIVE)
+
+    def check(self, caller: str):
+        """Raise QueueFull if admit(caller) would be rejected right now, without taking anything in."""
+        depth = sum(self._outstanding.values())
+        mine = self._outstanding.get(caller, 0)
+        reason = None
+        if depth >= _env_int("AI_QUEUE_MAX_DEPTH", 200):
+            reason = "too many queued requests"
+        elif mine >= _env_int("AI_QUEUE_MAX_PER_CALLER", 20):
+            reason = "too many of your requests are queued"
+        if reason is None:
+            return
+        self.rejected += 1
+        rate = sum(queue.requests.rate for queue in self._queues.values()) or 1.0
+        raise QueueFull(max(1, math.ceil(max(depth, mine) / rate)), reason)
+
+    def admit(self, caller: str):
+        """Take a request in, or reject it early when too much is outstanding (raises QueueFull).
+
+        Every successful admit() must be paired with release() once the request is done.
+        """
+        self.check(caller)
+        self._outstanding[caller] += 1
+
+    def release(self, caller: str):
+        self._outstanding[caller] -= 1
+        if self._outstanding[caller] <= 0:
+            del self._outstanding[caller]
+
+    async def acquire(self, provider: str, tool: str, caller: str, tokens: int, priority: Optional[int] = None):
+        """Wait until the provider's buckets allow this call, in priority/fair-share order."""
+        queue = self._queue(provider)
+        priority = self.priority_for(tool) if priority is None else priority
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), tokens, caller, priority)
+        queue.waiting[priority].setdefault(caller, deque()).append(waiter)
+        self._pump(queue)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            queue.remove(waiter)
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as we were cancelled: give the capacity back
+                queue.requests.adjust(-1)
+                queue.tokens.adjust(-tokens)
+            self._pump(queue)
+            raise
+        waited = time.monotonic() - waiter.enqueued
+        self.granted[PRIORITY_NAMES[priority]] += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def settle(self, provider: str, estimated: int, actual: Optional[int]):
+        """Correct the token bucket once the real usage of a call is known."""
+        if actual is None:
+            return
+        self._queue(provider).tokens.adjust(actual - estimated)
+
+    def _pump(self, queue: ProviderQueue):
+        if queue.timer is not None:
+            queue.timer.cancel()
+            queue.timer = None
+        while True:
+            waiter = queue.head()
+            if waiter is None:
+                return
+            if waiter.future.done():
+                queue.pop(waiter)
+                continue
+            wait = max(queue.requests.wait_time(1), queue.tokens.wait_time(waiter.tokens))
+            if wait > 0:
+                loop = asyncio.get_running_loop()
+                queue.timer = loop.call_later(wait, self._pump, queue)
+                return
+            queue.requests.take(1)
+            queue.tokens.take(waiter.tokens)
+            queue.pop(waiter)
+            waiter.future.set_result(None)
+
+    def stats(self) -> dict:
+        granted = sum(self.granted.values())
+        providers = {}
+        for name, queue in self._queues.items():
+            providers[name] = {
+                "queued": {
+                    PRIORITY_NAMES[p]: sum(len(q) for q in callers.values())
+                    for p, callers in queue.waiting.items()
+                },
+                "queued_callers": len({c for callers in queue.waiting.values() for c in callers}),
+                "requests_per_minute": queue.requests.capacity,
+                "tokens_per_minute": queue.tokens.capacity,
+                "requests_available": round(queue.requests.level, 1),
+                "tokens_available": round(queue.tokens.level),
+            }
+        return {
+            "providers": providers,
+            "outstanding": sum(self._outstanding.values()),
+            "outstanding_callers": len(self._outstanding),
+            "granted": dict(self.granted),
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / granted * 1000, 1) if granted else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+        }
+
+
+scheduler = Scheduler()
@@ -0,0 +1,68 @@
+"""
+Single-flight coalescing of identical concurrent AI requests.
+
+The first caller for a key (the leader) starts the upstream call; callers
+that arrive with the same key while it is running await the same result
+instead of paying for their own call. The call runs as its own task, so a
+leader whose client disconnects does not cancel it for the others.
+Anything tied to the upstream call rather than to one waiter (such as a
+scheduler slot) is released through do()'s `on_done`, which runs when the
+call finishes even if every waiter has gone.
+"""
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Optional
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.coalesced_by_tool: Counter = Counter()
+        self.max_waiters = 0
+        self._waiters: Counter = Counter()
+
+    async def do(
+        self, key: str, tool: str, fn: Callable[[], Awaitable], on_done: Optional[Callable[[asyncio.Task], None]] = None
+    ):
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done, key=key: self._finished(key, done))
+        else:
+            self.coalesced += 1
+            self.coalesced_by_tool[tool] += 1
+        if on_done is not None:
+            task.add_done_callback(on_done)
+        self._waiters[key] += 1
+        self.max_waiters = max(self.max_waiters, self._waiters[key])
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[key] -= 1
+            if self._waiters[key] <= 0:
+                del self._waiters[key]
+
+    def _finished(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_rate": round(self.coalesced / calls, 4) if calls else 0.0,
+            "coalesced_by_tool": dict(self.coalesced_by_tool),
+            "max_waiters": self.max_waiters,
+        }
+
+
+single_flight = SingleFlight()
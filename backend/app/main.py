@@ -3,12 +3,32 @@ from fastapi.middleware.cors import CORSMiddleware
 from .routes import ai, blog, admin, user, auth, bookmarks, settings
 from .database import engine, get_db
 from . import models
+from .search import ensure_search_index
+from .derived import derived_fields, ensure_derived_columns
+from .compression import CompressionMiddleware, CachedStaticFiles
+from .llm.clients import llm_clients
+from .jobs import job_runner
+from .keywords import corpus_idf
 from sqlalchemy.exc import OperationalError
 
 # Create tables
 models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="AI Blog Platform API", version="1.0.0")
+# ...and add columns introduced since (their indexes are created below)
+ensure_derived_columns(engine)
+
+# create_all() skips tables that already exist, so add any new indexes explicitly
+for index in models.Blog.__table__.indexes:
+    index.create(bind=engine, checkfirst=True)
+
+# Full-text search index (populate existing databases with rebuild_search_index.py)
+ensure_search_index(engine)
+
+# Routes declare response models, so responses are validated and serialized by pydantic-core
+app = FastAPI(
+    title="AI Blog Platform API",
+    version="1.0.0",
+)
 
 
 # Enable CORS for frontend
@@ -21,13 +41,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-from fastapi.staticfiles import StaticFiles
+# gzip/brotli for JSON and text responses (cached blog reads arrive pre-compressed)
+app.add_middleware(CompressionMiddleware)
+
 import os
 
 # Create static/avatars directory if it doesn't exist
 os.makedirs("static/avatars", exist_ok=True)
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
 
 app.include_router(ai.router, prefix="/api/ai", tags=["AI"])
 app.include_router(blog.router, prefix="/api/blog", tags=["Blog"])
@@ -39,6 +61,45 @@ app.include_router(settings.router, prefix="/api/settings", tags=["Settings"])
 from .routes import comments
 app.include_router(comments.router, prefix="/api/comments", tags=["Comments"])
 
+@app.on_event("startup")
+async def start_llm_clients():
+    """Build the LLM clients and their shared connection pool once per process."""
+    await llm_clients.startup()
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    """Start the generation job workers and resume jobs left queued by a previous run."""
+    await job_runner.start()
+
+
+@app.on_event("startup")
+async def start_derived_fields():
+    """Start the worker that precomputes AI-derived blog fields and resume pending posts."""
+    await derived_fields.start()
+
+
+@app.on_event("startup")
+def warm_keyword_index():
+    """Load the corpus IDF table used for local keyword extraction in the background."""
+    corpus_idf.maybe_refresh()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await job_runner.stop()
+
+
+@app.on_event("shutdown")
+async def stop_derived_fields():
+    await derived_fields.stop()
+
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    await llm_clients.shutdown()
+
+
 @app.on_event("startup")
 def seed_admin_user():
     """Ensure a default admin user exists.
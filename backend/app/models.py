@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, JSON
+from sqlalchemy import Column, Integer, String, JSON, Index
 from .database import Base
 from datetime import datetime
 
@@ -14,6 +14,48 @@ class Blog(Base):
     created_at = Column(String, default=datetime.now().isoformat())
     updated_at = Column(String, default=datetime.now().isoformat())
 
+    # Derived from `content` at write time (see app/derived.py)
+    content_hash = Column(String, nullable=True)
+    word_count = Column(Integer, nullable=True)
+    reading_time = Column(Integer, nullable=True) # Minutes
+    # AI-derived, filled in asynchronously after each write; stale while derived_hash != content_hash
+    summary = Column(String, nullable=True)
+    headline_suggestions = Column(JSON, nullable=True)
+    derived_hash = Column(String, nullable=True)
+    derived_version = Column(Integer, nullable=True)
+    derived_at = Column(String, nullable=True)
+    derived_pending = Column(Integer, default=0, index=True) # 1 until the AI-derived fields match content
+
+    # Keyset pagination walks these in (created_at, id) order
+    __table_args__ = (
+        Index("ix_blogs_created_at_id", "created_at", "id"),
+        Index("ix_blogs_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
+class Tag(Base):
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True) # Normalized (Title Case) tag name
+    blog_count = Column(Integer, default=0, index=True) # Kept in sync by app/tags.py
+
+class BlogTag(Base):
+    __tablename__ = "blog_tags"
+
+    blog_id = Column(Integer, primary_key=True)
+    tag_id = Column(Integer, primary_key=True)
+
+    # Tag-filtered listings look blogs up by tag
+    __table_args__ = (
+        Index("ix_blog_tags_tag_id_blog_id", "tag_id", "blog_id"),
+    )
+
+class KeywordTerm(Base):
+    __tablename__ = "keyword_terms"
+
+    word = Column(String, primary_key=True)
+    doc_count = Column(Integer, default=0) # Posts containing the word, kept in sync by app/keywords.py
+
 class User(Base):
     __tablename__ = "users"
 
@@ -52,6 +94,45 @@ class Comment(Base):
     blog_id = Column(Integer, index=True)
     created_at = Column(String, default=datetime.now().isoformat())
 
+class CollectionVersion(Base):
+    __tablename__ = "collection_versions"
+
+    name = Column(String, primary_key=True) # e.g., "blogs"
+    version = Column(Integer, default=0) # Bumped on every write to the collection
+    updated_at = Column(String, default=datetime.now().isoformat())
+
+class AIResponseCache(Base):
+    __tablename__ = "ai_response_cache"
+
+    key = Column(String, primary_key=True) # sha256 of (tool, models, messages, params)
+    tool = Column(String, index=True)
+    provider = Column(String)
+    model = Column(String) # Model that actually produced the response
+    response = Column(String)
+    size = Column(Integer, default=0) # Bytes of `response`, for size-based eviction
+    hits = Column(Integer, default=0)
+    created_at = Column(String, default=datetime.now().isoformat())
+    last_used_at = Column(String, index=True) # Least recently used entries are evicted first
+    expires_at = Column(String, index=True)
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+
+    id = Column(String, primary_key=True) # uuid4 hex, returned to the client as job_id
+    status = Column(String, index=True, default="queued") # queued, running, done, failed
+    topic = Column(String)
+    length = Column(String, default="medium")
+    language = Column(String, default="English")
+    user_id = Column(Integer, index=True, nullable=True)
+    idempotency_key = Column(String, unique=True, nullable=True) # Idempotency-Key header, so retries reuse the job
+    blog_id = Column(Integer, nullable=True)
+    message = Column(String, nullable=True)
+    error = Column(String, nullable=True)
+    attempts = Column(Integer, default=0)
+    created_at = Column(String, default=datetime.now().isoformat())
+    started_at = Column(String, nullable=True)
+    finished_at = Column(String, nullable=True)
+
 class SystemConfig(Base):
     __tablename__ = "system_config"
 
@@ -61,3 +142,12 @@ class SystemConfig(Base):
     image_model = Column(String, default="DALL-E 3 (OpenAI)")
     image_style = Column(String, default="Digital Art")
     updated_at = Column(String, default=datetime.now().isoformat())
+
+class BlogTranslation(Base):
+    __tablename__ = "blog_translations"
+
+    blog_id = Column(Integer, primary_key=True)
+    language = Column(String, primary_key=True) # Normalized by app/translations.py ("french", not "fr")
+    paragraph_hash = Column(String, primary_key=True) # sha256 of the source paragraph
+    translated = Column(String)
+    created_at = Column(String, default=datetime.now().isoformat())
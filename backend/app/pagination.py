@@ -0,0 +1,42 @@
+import base64
+import json
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: Optional[str], blog_id: int) -> str:
+    """Encode the (created_at, id) keyset position of a row as an opaque cursor."""
+    raw = json.dumps([created_at or "", blog_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a cursor produced by encode_cursor. Raises a 400 on malformed input."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, blog_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(created_at), int(blog_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_offset_cursor(offset: int) -> str:
+    """Encode a result offset as an opaque cursor, for rank-ordered results
+    (e.g. search) that have no stable keyset."""
+    return base64.urlsafe_b64encode(f"o:{offset}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    """Decode a cursor produced by encode_offset_cursor. Raises a 400 on malformed input."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, offset = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").split(":")
+        if prefix != "o" or int(offset) < 0:
+            raise ValueError(cursor)
+        return int(offset)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -1,13 +1,87 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session, defer
+from sqlalchemy.orm import Session
 from sqlalchemy import func
 from ..database import get_db
 from .. import models
+from ..tags import top_tags
+from ..cache import read_cache
+from ..llm.clients import llm_clients
+from ..llm.response_cache import response_cache
+from ..llm.singleflight import single_flight
+from ..llm.hedging import latency
+from ..llm.breaker import breakers
+from ..llm.scheduler import scheduler
+from ..derived import derived_fields
+from pydantic import BaseModel
+from typing import List
 from datetime import datetime, timedelta
 
 router = APIRouter()
 
-@router.get("/stats")
+class AdminStats(BaseModel):
+    total_blogs: int
+    total_users: int
+    ai_requests: int
+
+class ChartPoint(BaseModel):
+    name: str
+    requests: int
+
+class CategoryPoint(BaseModel):
+    name: str
+    value: int
+
+class AdminStatsResponse(BaseModel):
+    success: bool
+    stats: AdminStats
+    chart_data: List[ChartPoint]
+    category_data: List[CategoryPoint] = []
+
+class AdminUser(BaseModel):
+    id: int
+    email: str
+    full_name: str
+    role: str
+    bio: str
+    created_at: str
+
+class AdminUsersResponse(BaseModel):
+    success: bool
+    users: List[AdminUser]
+
+class CacheStatsResponse(BaseModel):
+    success: bool
+    cache: dict
+
+class LLMPoolStatsResponse(BaseModel):
+    success: bool
+    pool: dict
+
+class AICacheStatsResponse(BaseModel):
+    success: bool
+    cache: dict
+
+class CoalescingStatsResponse(BaseModel):
+    success: bool
+    coalescing: dict
+
+class LatencyStatsResponse(BaseModel):
+    success: bool
+    latency: dict
+
+class BreakerStatesResponse(BaseModel):
+    success: bool
+    breakers: dict
+
+class SchedulerStatsResponse(BaseModel):
+    success: bool
+    scheduler: dict
+
+class DerivedFieldsStatsResponse(BaseModel):
+    success: bool
+    derived: dict
+
+@router.get("/stats", response_model=AdminStatsResponse)
 def get_admin_stats(db: Session = Depends(get_db)):
     """
     Get real-time statistics for the admin dashboard.
@@ -62,43 +136,8 @@ def get_admin_stats(db: Session = Depends(get_db)):
         chart_data = []
     try:
         # 3. Content Categories (Tags distribution)
-        # Fetch all tags from all blogs. Defer content loading for performance.
-        all_blogs = db.query(models.Blog).options(defer(models.Blog.content)).all()
-        
-        tag_counts = {}
-        for blog in all_blogs:
-            if blog.tags:
-                try:
-                    import json
-                    # Handle if it is a list or a JSON string
-                    if isinstance(blog.tags, list):
-                        tags_list = blog.tags
-                    elif isinstance(blog.tags, str):
-                        try:
-                            # Try to parse '["AI Generated"]'
-                            tags_list = json.loads(blog.tags)
-                            if not isinstance(tags_list, list):
-                                # Maybe it's just a comma-separated string? "AI Generated, Tech"
-                                tags_list = [t.strip() for t in blog.tags.split(",")]
-                        except:
-                            # Fallback if JSON parse fails
-                            tags_list = [t.strip() for t in blog.tags.split(",")]
-                    else:
-                        tags_list = []
-                    
-                    for tag in tags_list:
-                        if not isinstance(tag, str): continue
-                        # Normalize tag: Title case
-                        clean_tag = tag.strip().title()
-                        if clean_tag:
-                            tag_counts[clean_tag] = tag_counts.get(clean_tag, 0) + 1
-                except:
-                    pass
-        
-        # Sort by count and take top 5
-        sorted_tags = sorted(tag_counts.items(), key=lambda item: item[1], reverse=True)[:5]
-        
-        category_data = [{"name": tag, "value": count} for tag, count in sorted_tags]
+        # Per-tag counts are maintained on write, so this is a single indexed read.
+        category_data = top_tags(db, 5)
         
         # If no data, provide a placeholder so chart isn't empty
         if not category_data:
@@ -119,7 +158,7 @@ def get_admin_stats(db: Session = Depends(get_db)):
         "category_data": category_data
     }
 
-@router.get("/users")
+@router.get("/users", response_model=AdminUsersResponse)
 def get_all_users(db: Session = Depends(get_db)):
     """Get all users for admin management."""
     try:
@@ -146,3 +185,68 @@ def get_all_users(db: Session = Depends(get_db)):
             "success": True,
             "users": []
         }
+
+@router.get("/cache-stats", response_model=CacheStatsResponse)
+def get_cache_stats():
+    """Hit/miss/eviction counters for the in-process read cache (this worker only)."""
+    return {
+        "success": True,
+        "cache": read_cache.stats()
+    }
+
+@router.get("/llm-pool", response_model=LLMPoolStatsResponse)
+def get_llm_pool_stats():
+    """Client builds/reloads and upstream request counts for the LLM providers (this worker only)."""
+    return {
+        "success": True,
+        "pool": llm_clients.stats()
+    }
+
+@router.get("/ai-cache", response_model=AICacheStatsResponse)
+def get_ai_cache_stats():
+    """Hit/miss counters and size of the persistent AI response cache."""
+    return {
+        "success": True,
+        "cache": response_cache.stats()
+    }
+
+@router.get("/ai-coalescing", response_model=CoalescingStatsResponse)
+def get_ai_coalescing_stats():
+    """How many identical concurrent AI requests shared one upstream call (this worker only)."""
+    return {
+        "success": True,
+        "coalescing": single_flight.stats()
+    }
+
+@router.get("/ai-latency", response_model=LatencyStatsResponse)
+def get_ai_latency_stats():
+    """Observed upstream latency per tool/model, the hedge delays derived from it, and hedge counts."""
+    return {
+        "success": True,
+        "latency": latency.stats()
+    }
+
+@router.get("/ai-breakers", response_model=BreakerStatesResponse)
+def get_ai_breaker_states():
+    """Circuit breaker state per provider/model: closed, open (skipped) or half_open (probing)."""
+    return {
+        "success": True,
+        "breakers": breakers.stats()
+    }
+
+@router.get("/ai-scheduler", response_model=SchedulerStatsResponse)
+def get_ai_scheduler_stats():
+    """Queue depth per provider and priority, rate-limit bucket levels, waits and rejections."""
+    return {
+        "success": True,
+        "scheduler": scheduler.stats()
+    }
+
+@router.get("/ai-derived", response_model=DerivedFieldsStatsResponse)
+def get_derived_fields_stats(db: Session = Depends(get_db)):
+    """Posts still waiting for their precomputed summary/headlines, and worker counters (this worker only)."""
+    pending = db.query(func.count(models.Blog.id)).filter(models.Blog.derived_pending == 1).scalar() or 0
+    return {
+        "success": True,
+        "derived": {"pending": pending, **derived_fields.stats()}
+    }
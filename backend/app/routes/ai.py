@@ -1,10 +1,31 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Optional, List, Tuple
+import asyncio
+import difflib
+import inspect
+import json
+import re
 import os
+import time
 from dotenv import load_dotenv
-from groq import Groq
-from openai import OpenAI
+from groq import AsyncGroq
+from openai import AsyncOpenAI
+from ..schemas import MessageResponse
+from ..database import SessionLocal
+from .. import models
+from ..jobs import job_runner, FINISHED
+from ..derived import derived_fields, stamp_content
+from .. import translations as translation_store
+from .. import summarizer
+from ..keywords import best_keyword, blog_words, suggest_tags, sync_blog_words
+from ..llm.breaker import breakers, counts_as_failure
+from ..llm.chunking import count_tokens, paragraph_hash, split_into_chunks, split_paragraphs
+from ..llm.clients import llm_clients
+from ..llm.gateway import complete, Completion, LLMUnavailable, FAST_CHAIN, GROQ_LARGE, PROVIDER_NAMES
+from ..llm.scheduler import BULK, QueueFull, admitted_var, caller_var, estimate_tokens, priority_var, scheduler
 
 
 # Load .env explicitly
@@ -16,35 +37,22 @@ print(f"[DEBUG] Loading .env from {env_path}, exists: {env_path.exists()}", flus
 
 
 
-router = APIRouter()
+async def identify_caller(request: Request):
+    """Tag this request's upstream AI calls with who made it, for fair scheduling."""
+    caller_var.set(f"ip:{request.client.host}" if request.client else "anonymous")
 
 
-def get_groq_client() -> Optional[Groq]:
-    """Return a Groq client if GROQ_API_KEY is set, otherwise None."""
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        print("[DEBUG] GROQ_API_KEY is missing", flush=True)
-        return None
-    print(f"[DEBUG] GROQ_API_KEY found: {api_key[:4]}...", flush=True)
-    try:
-        return Groq(api_key=api_key)
-    except Exception as e:
-        print(f"[AI] Error creating Groq client: {e}")
-        return None
+router = APIRouter(dependencies=[Depends(identify_caller)])
 
 
-def get_openai_client() -> Optional[OpenAI]:
-    """Return an OpenAI client if OPENAI_API_KEY is set, otherwise None."""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        print("[DEBUG] OPENAI_API_KEY is missing", flush=True)
-        return None
-    print(f"[DEBUG] OPENAI_API_KEY found: {api_key[:4]}...", flush=True)
-    try:
-        return OpenAI(api_key=api_key)
-    except Exception as e:
-        print(f"[AI] Error creating OpenAI client: {e}")
-        return None
+def get_groq_client() -> Optional[AsyncGroq]:
+    """Return the shared Groq client if GROQ_API_KEY is set, otherwise None."""
+    return llm_clients.get("groq")
+
+
+def get_openai_client() -> Optional[AsyncOpenAI]:
+    """Return the shared OpenAI client if OPENAI_API_KEY is set, otherwise None."""
+    return llm_clients.get("openai")
 
 
 # Request/Response models
@@ -74,36 +82,111 @@ class PlagiarismCheckRequest(BaseModel):
     content: str
 
 
-def extract_image_keyword(text):
-    """Extract a single visual keyword from text using AI."""
-    groq_client = get_groq_client()
-    openai_client = get_openai_client()
-    
+# Response models
+class GenerateBlogResponse(BaseModel):
+    success: bool
+    content: str
+    message: str
+
+class SummaryResponse(BaseModel):
+    success: bool
+    summary: str
+    message: str
+
+class HeadlineResponse(BaseModel):
+    success: bool
+    headlines: List[str]
+    message: str
+
+class PlagiarismResponse(BaseModel):
+    success: bool
+    originality_score: int
+    is_original: bool
+    message: str
+
+class GrammarCorrection(BaseModel):
+    start: int # Character offsets into the submitted content
+    end: int
+    original: str
+    replacement: str
+
+class GrammarCheckResponse(BaseModel):
+    success: bool
+    corrected_content: str
+    message: str
+    corrections: List[GrammarCorrection] = []
+    paragraphs: Optional[int] = None
+    checked_paragraphs: Optional[int] = None # Sent upstream; the rest came from the AI response cache
+
+class CaptionResponse(BaseModel):
+    caption: str
+
+class ImageAnalysisResponse(BaseModel):
+    success: bool
+    caption: str
+    message: str
+
+class TranslateResponse(BaseModel):
+    translated_text: str
+    paragraphs: Optional[int] = None
+    reused_paragraphs: Optional[int] = None # Served from the blog's stored translations
+
+class ToneChangeResponse(BaseModel):
+    success: bool
+    content: str
+    message: Optional[str] = None
+
+class GenerationJobOut(BaseModel):
+    id: str
+    status: str
+    topic: Optional[str] = None
+    user_id: Optional[int] = None
+    blog_id: Optional[int] = None
+    message: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+class GenerationJobResponse(BaseModel):
+    success: bool
+    job: GenerationJobOut
+
+
+# Local keyword picks below this confidence are double-checked by the LLM
+KEYWORD_MIN_CONFIDENCE = float(os.getenv("AI_KEYWORD_MIN_CONFIDENCE", "0.25"))
+
+
+async def extract_image_keyword(text):
+    """Extract a single visual keyword from text, locally when confident, otherwise using AI."""
     try:
         print(f"[AI] Extracting keyword for: {text}", flush=True)
         # Simple heuristic: if short (<= 2 words), use as is
         if len(text.split()) <= 2:
             return text
-            
+
+        local_keyword, confidence = best_keyword(text)
+        if local_keyword and confidence >= KEYWORD_MIN_CONFIDENCE:
+            print(f"[AI] Extracted keyword locally: {local_keyword} (confidence {confidence})", flush=True)
+            return local_keyword.title()
+
         # Use Groq or OpenAI to extract
-        client = groq_client if groq_client else openai_client
-        if not client:
-            return text
-        
-        model = "llama-3.1-8b-instant" if groq_client else "gpt-3.5-turbo"
-        
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a keyword extractor. Output ONLY a single visual keyword (noun) that best represents the topic for an image search. Example: 'Artificial Intelligence' -> 'Technology'. 'Healthy Cooking' -> 'Food'."},
-                {"role": "user", "content": text}
-            ],
-            max_tokens=10,
-            temperature=0.3
-        )
-        keyword = resp.choices[0].message.content.strip().split()[0]
+        try:
+            result = await complete(
+                "image_keyword",
+                FAST_CHAIN,
+                [
+                    {"role": "system", "content": "You are a keyword extractor. Output ONLY a single visual keyword (noun) that best represents the topic for an image search. Example: 'Artificial Intelligence' -> 'Technology'. 'Healthy Cooking' -> 'Food'."},
+                    {"role": "user", "content": text}
+                ],
+                max_tokens=10,
+                temperature=0.3
+            )
+        except LLMUnavailable:
+            return local_keyword.title() if local_keyword else text
+        keyword = result.text.strip().split()[0]
         # Remove non-alphanumeric just in case
-        import re
         keyword = re.sub(r'[^a-zA-Z0-9]', '', keyword)
         print(f"[AI] Extracted keyword: {keyword}", flush=True)
         return keyword
@@ -112,8 +195,6 @@ def extract_image_keyword(text):
         return text.split()[0] if text else "technology"
 
 def log_ai_usage(tool_name: str, success: bool = True):
-    from ..database import SessionLocal
-    from .. import models
     from datetime import datetime
     
     db = SessionLocal()
@@ -131,173 +212,203 @@ def log_ai_usage(tool_name: str, success: bool = True):
         db.close()
 
 
-@router.post("/generate-blog")
-def generate_blog(request: GenerateBlogRequest):
-    """Generate a blog article. Use Groq if available, then OpenAI, otherwise fallback."""
-    groq_client = get_groq_client()
-    openai_client = get_openai_client()
-    topic = request.topic.strip() or "your topic"
-    language = request.language or "English"
-
-    length_map_prompts = {
-        "short": "300-500 words",
-        "medium": "800-1200 words",
-        "long": "1500-2000 words",
-    }
-    word_count = length_map_prompts.get(request.length, "800-1200 words")
-
-    # Log usage
-    log_ai_usage("blog_generator")
-
-    # Helper to save blog to DB
-    def save_generated_blog(title, content, user_id):
-        try:
-            from ..database import SessionLocal
-            from .. import models
-            from datetime import datetime
-            
-            db = SessionLocal()
-            
-            author_name = "AI Generated"
-            if user_id:
-                user = db.query(models.User).filter(models.User.id == user_id).first()
-                if user:
-                    author_name = user.full_name
-
-            new_blog = models.Blog(
-                title=title,
-                content=content,
-                author=author_name,
-                user_id=user_id,
-                tags=["AI Generated"],
-                created_at=datetime.now().isoformat(),
-                updated_at=datetime.now().isoformat()
-            )
-            db.add(new_blog)
-            db.commit()
-            db.refresh(new_blog)
-            db.close()
-            print(f"[AI] Saved generated blog: {title} (ID: {new_blog.id})")
-        except Exception as e:
-            print(f"[AI] Failed to save generated blog: {e}")
-
-    # Helper function to process content and generate images
-    def process_content_images(content, topic):
-        import re
+def save_generated_blog(title, content, user_id):
+    """Persist a generated article as a blog post. Returns the new id, or None on failure."""
+    try:
+        from .. import search as search_index
+        from .. import tags as tag_index
+        from ..conditional import bump_collection_version
+        from ..cache import read_cache
+        from datetime import datetime
         
-        # Strip all [IMAGE: ...] tags to ensure clean text output
-        # regex to find [IMAGE: description]
-        final_content = re.sub(r'\[IMAGE: .*?\]', '', content)
+        db = SessionLocal()
         
-        # Also remove potential double newlines caused by removal
-        final_content = re.sub(r'\n\s*\n\s*\n', '\n\n', final_content)
-                
-        return final_content
-
-    # --- Try Groq first ---
-    if groq_client:
-        try:
-            resp = groq_client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            f"You are an expert analyst and subject matter authority. You must write the article in {language}. "
-                            "Your goal is to write a deep, insightful article about the TOPIC itself. "
-                            "CRITICAL RULE: Do NOT write a tutorial, 'how-to', or guide on 'how to blog' or 'how to use' the topic. "
-                            "If the topic is a company (e.g. 'Microsoft', 'Google'), write about its history, business, products, and impact on the world. "
-                            "If the topic is 'Microsoft', do NOT write about 'creating a blog on Microsoft'. Write about the tech giant itself. "
-                            "Directly address the subject matter with facts, history, social, and economic analysis. "
-                            "Use a 'Premium' tone: authoritative, sophisticated, and engaging. "
-                            "Structure: Introduction (hook), Key Concepts (deep dive), Real-world Examples, and a Thought-provoking Conclusion. "
-                            "Do NOT include the Title at the very top, as it is handled separately. "
-                            "Start directly with the introduction."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": (
-                            f"Write a comprehensive, analytical article about: '{topic}' in {language}. "
-                            f"Target length: {word_count}. "
-                            "Use markdown with clear headings (##, ###), bullet points, and bold text for emphasis."
-                        ),
-                    },
-                ],
-                temperature=0.7,
-                max_tokens=2000,
-            )
-            content = resp.choices[0].message.content
-            
-            # Process images (Header + Inline)
-            final_content = process_content_images(content, topic)
-            
-            # Save to DB
-            save_generated_blog(topic, final_content, request.user_id)
+        author_name = "AI Generated"
+        if user_id:
+            user = db.query(models.User).filter(models.User.id == user_id).first()
+            if user:
+                author_name = user.full_name
+
+        new_blog = models.Blog(
+            title=title,
+            content=content,
+            author=author_name,
+            user_id=user_id,
+            tags=["AI Generated"] + suggest_tags(f"{title}\n{content}"),
+            created_at=datetime.now().isoformat(),
+            updated_at=datetime.now().isoformat()
+        )
+        stamp_content(new_blog)
+        db.add(new_blog)
+        db.flush()
+        search_index.index_blog(db, new_blog)
+        tag_index.sync_blog_tags(db, new_blog.id, new_blog.tags)
+        sync_blog_words(db, set(), blog_words(new_blog.title, new_blog.content))
+        bump_collection_version(db)
+        db.commit()
+        db.refresh(new_blog)
+        db.close()
+        read_cache.invalidate_prefix("blog_list", "user")
+        derived_fields.notify()
+        print(f"[AI] Saved generated blog: {title} (ID: {new_blog.id})")
+        return new_blog.id
+    except Exception as e:
+        print(f"[AI] Failed to save generated blog: {e}")
+        return None
 
-            return {
-                "success": True,
-                "content": final_content,
-                "message": "Blog generated using Groq (llama-3.1-8b-instant) with DALL-E 3 images.",
-            }
-        except Exception as e:
-            print(f"[AI] Groq error in generate_blog: {e}")
 
-    # --- Try OpenAI next ---
-    if openai_client:
-        try:
-            resp = openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are an expert analyst and subject matter authority. "
-                            "Your goal is to write a deep, insightful article about the TOPIC itself. "
-                            "CRITICAL RULE: Do NOT write a tutorial, 'how-to', or guide on 'how to blog' or 'how to use' the topic. "
-                            "If the topic is a company (e.g. 'Microsoft', 'Google'), write about its history, business, products, and impact on the world. "
-                            "If the topic is 'Microsoft', do NOT write about 'creating a blog on Microsoft'. Write about the tech giant itself. "
-                            "Directly address the subject matter with facts, history, social, and economic analysis. "
-                            "Use a 'Premium' tone: authoritative, sophisticated, and engaging. "
-                            "Do NOT include the Title at the very top."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": (
-                            f"Write a comprehensive, analytical article about: '{topic}'. "
-                            f"Target length: {word_count}. "
-                            "Use markdown with clear headings."
-                        ),
-                    },
-                ],
-                temperature=0.7,
-                max_tokens=2000,
-            )
-            content = resp.choices[0].message.content
+def process_content_images(content, topic=None):
+    """Strip all [IMAGE: ...] tags to ensure clean text output."""
+    
+    # regex to find [IMAGE: description]
+    final_content = re.sub(r'\[IMAGE: .*?\]', '', content)
+    
+    # Also remove potential double newlines caused by removal
+    final_content = re.sub(r'\n\s*\n\s*\n', '\n\n', final_content)
             
-            # Process images (Header + Inline)
-            final_content = process_content_images(content, topic)
+    return final_content
+
+
+class ImageTagStripper:
+    """Incremental version of process_content_images() for a token stream.
+
+    feed() returns the text that is safe to emit so far; anything that could
+    still turn into an [IMAGE: ...] tag or a run of blank lines is held back
+    until later tokens decide it. The concatenated output equals
+    process_content_images() applied to the whole text.
+    """
+
+    MARKER = "[IMAGE: "
+
+    def __init__(self):
+        self._pending = ""   # raw text not yet checked for tags
+        self._space = ""     # trailing whitespace held back for blank-line collapsing
+
+    def feed(self, text: str) -> str:
+        self._pending += text
+        out = []
+        while self._pending:
+            start = self._pending.find(self.MARKER)
+            if start == -1:
+                # Hold back a tail that may be the beginning of a marker
+                keep = 0
+                for size in range(min(len(self.MARKER) - 1, len(self._pending)), 0, -1):
+                    if self.MARKER.startswith(self._pending[-size:]):
+                        keep = size
+                        break
+                cut = len(self._pending) - keep
+                out.append(self._pending[:cut])
+                self._pending = self._pending[cut:]
+                break
+            out.append(self._pending[:start])
+            rest = self._pending[start + len(self.MARKER):]
+            close = rest.find("]")
+            newline = rest.find("\n")
+            if newline != -1 and (close == -1 or newline < close):
+                # Not a tag (tags never span lines): emit the "[" and rescan after it
+                out.append(self._pending[start])
+                self._pending = self._pending[start + 1:]
+            elif close == -1:
+                # Tag still open; wait for more tokens
+                self._pending = self._pending[start:]
+                break
+            else:
+                self._pending = rest[close + 1:]
+        return self._collapse("".join(out))
+
+    def flush(self) -> str:
+        pending, self._pending = self._pending, ""
+        text = self._collapse(pending)
+        space, self._space = self._space, ""
+        return text + self._normalize_space(space)
+
+    def _collapse(self, text: str) -> str:
+        text = self._space + text
+        stripped = text.rstrip()
+        self._space = text[len(stripped):]
+        if not stripped:
+            return ""
+        return re.sub(r'\n\s*\n\s*\n', '\n\n', stripped)
+
+    @staticmethod
+    def _normalize_space(space: str) -> str:
+        return re.sub(r'\n\s*\n\s*\n', '\n\n', space)
+
+
+LENGTH_WORD_COUNTS = {
+    "short": "300-500 words",
+    "medium": "800-1200 words",
+    "long": "1500-2000 words",
+}
+
+
+def blog_prompt_messages(provider: str, topic: str, language: str, word_count: str):
+    """Chat messages for generate-blog; each provider has its own tuned prompt."""
+    if provider == "groq":
+        return [
+            {
+                "role": "system",
+                "content": (
+                    f"You are an expert analyst and subject matter authority. You must write the article in {language}. "
+                    "Your goal is to write a deep, insightful article about the TOPIC itself. "
+                    "CRITICAL RULE: Do NOT write a tutorial, 'how-to', or guide on 'how to blog' or 'how to use' the topic. "
+                    "If the topic is a company (e.g. 'Microsoft', 'Google'), write about its history, business, products, and impact on the world. "
+                    "If the topic is 'Microsoft', do NOT write about 'creating a blog on Microsoft'. Write about the tech giant itself. "
+                    "Directly address the subject matter with facts, history, social, and economic analysis. "
+                    "Use a 'Premium' tone: authoritative, sophisticated, and engaging. "
+                    "Structure: Introduction (hook), Key Concepts (deep dive), Real-world Examples, and a Thought-provoking Conclusion. "
+                    "Do NOT include the Title at the very top, as it is handled separately. "
+                    "Start directly with the introduction."
+                ),
+            },
+            {
+                "role": "user",
+                "content": (
+                    f"Write a comprehensive, analytical article about: '{topic}' in {language}. "
+                    f"Target length: {word_count}. "
+                    "Use markdown with clear headings (##, ###), bullet points, and bold text for emphasis."
+                ),
+            },
+        ]
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are an expert analyst and subject matter authority. "
+                "Your goal is to write a deep, insightful article about the TOPIC itself. "
+                "CRITICAL RULE: Do NOT write a tutorial, 'how-to', or guide on 'how to blog' or 'how to use' the topic. "
+                "If the topic is a company (e.g. 'Microsoft', 'Google'), write about its history, business, products, and impact on the world. "
+                "If the topic is 'Microsoft', do NOT write about 'creating a blog on Microsoft'. Write about the tech giant itself. "
+                "Directly address the subject matter with facts, history, social, and economic analysis. "
+                "Use a 'Premium' tone: authoritative, sophisticated, and engaging. "
+                "Do NOT include the Title at the very top."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"Write a comprehensive, analytical article about: '{topic}'. "
+                f"Target length: {word_count}. "
+                "Use markdown with clear headings."
+            ),
+        },
+    ]
 
-            # Save to DB
-            save_generated_blog(topic, final_content, request.user_id)
 
-            return {
-                "success": True,
-                "content": final_content,
-                "message": "Blog generated using OpenAI (gpt-3.5-turbo) with DALL-E 3 images.",
-            }
-        except Exception as e:
-            print(f"[AI] OpenAI error in generate_blog: {e}")
+# Models tried in order (the prompts in blog_prompt_messages are tuned per provider)
+BLOG_CHAIN = FAST_CHAIN
 
+VISION_CHAIN = (("groq", "meta-llama/llama-4-scout-17b-16e-instruct"), ("openai", "gpt-4o"))
 
-    # --- Fallback: local template ---
+
+def template_blog(topic: str, length: Optional[str]) -> str:
+    """Local template article used when no AI provider is configured or all fail."""
     length_map_paragraphs = {
         "short": 3,
         "medium": 5,
         "long": 8,
     }
-    paragraphs = length_map_paragraphs.get(request.length, 5)
+    paragraphs = length_map_paragraphs.get(length, 5)
 
     intro = (
         f"{topic.capitalize()} has become an important subject in the modern world. "
@@ -327,24 +438,311 @@ def generate_blog(request: GenerateBlogRequest):
 
     # Inject dynamic image fallback
     image_url = f"https://source.unsplash.com/1600x900/?{topic.replace(' ', ',')}"
-    content = f"![{topic}]({image_url})\n\n# {topic}\n\n{intro}\n\n" + "\n\n".join(selected) + f"\n\n{conclusion}"
+    return f"![{topic}]({image_url})\n\n# {topic}\n\n{intro}\n\n" + "\n\n".join(selected) + f"\n\n{conclusion}"
+
+
+def blog_caller(user_id: Optional[int]) -> str:
+    """Scheduler identity for a generation: the user when known, else the client address."""
+    return f"user:{user_id}" if user_id else caller_var.get()
+
+
+TEMPLATE_BLOG_MESSAGE = "Blog generated using the built‑in template (AI services not configured or failed)."
+
+
+def sse_event(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+async def run_generation(topic: str, length: Optional[str], language: Optional[str], user_id: Optional[int]):
+    """Generate an article and save it as a post. Returns (content, message, blog_id).
+
+    Shared by the inline endpoint and the background job workers.
+    """
+    topic = topic.strip() or "your topic"
+    language = language or "English"
+    word_count = LENGTH_WORD_COUNTS.get(length, "800-1200 words")
+
+    # Log usage
+    await run_in_threadpool(log_ai_usage, "blog_generator")
+
+    # --- Try Groq first, then OpenAI ---
+    try:
+        result = await complete(
+            "generate_blog",
+            BLOG_CHAIN,
+            {provider: blog_prompt_messages(provider, topic, language, word_count) for provider, _ in BLOG_CHAIN},
+            caller=blog_caller(user_id),
+            temperature=0.7,
+            max_tokens=2000,
+        )
+        
+        # Process images (Header + Inline)
+        content = process_content_images(result.text, topic)
+        message = f"Blog generated using {result.label} with DALL-E 3 images."
+    except LLMUnavailable:
+        # --- Fallback: local template ---
+        content = template_blog(topic, length)
+        message = TEMPLATE_BLOG_MESSAGE
 
     # Save to DB
-    save_generated_blog(topic, content, request.user_id)
+    blog_id = await run_in_threadpool(save_generated_blog, topic, content, user_id)
+    return content, message, blog_id
+
 
+@router.post("/generate-blog", response_model=GenerateBlogResponse)
+async def generate_blog(request: GenerateBlogRequest):
+    """Generate a blog article. Use Groq if available, then OpenAI, otherwise fallback."""
+    content, message, _ = await run_generation(request.topic, request.length, request.language, request.user_id)
     return {
         "success": True,
         "content": content,
-        "message": "Blog generated using the built‑in template (AI services not configured or failed).",
+        "message": message,
     }
 
 
-@router.post("/summarize")
-def summarize_blog(request: SummarizeRequest):
+async def _run_generation_job(job):
+    _, message, blog_id = await run_generation(job.topic, job.length, job.language, job.user_id)
+    if blog_id is None:
+        raise RuntimeError("The generated article could not be saved")
+    return blog_id, message
+
+job_runner.set_handler(_run_generation_job)
+
+
+@router.post("/generate-blog/jobs", response_model=GenerationJobResponse, status_code=202)
+async def create_generation_job(
+    request: GenerateBlogRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """Queue a generation and return its job id at once; poll GET /jobs/{job_id} or subscribe to /events.
+
+    Retrying with the same Idempotency-Key returns the original job instead of creating a second post.
+    """
+    job, _ = await job_runner.submit(
+        request.topic, request.length, request.language, request.user_id, idempotency_key
+    )
+    return {"success": True, "job": job}
+
+
+@router.get("/jobs/{job_id}", response_model=GenerationJobResponse)
+async def get_generation_job(job_id: str):
+    job = await run_in_threadpool(job_runner.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "job": job}
+
+
+@router.get("/jobs/{job_id}/events")
+async def generation_job_events(job_id: str):
+    """Server-Sent Events: a `status` event on every change, ending with the finished job."""
+    job = await run_in_threadpool(job_runner.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        current = job
+        last_status = None
+        while True:
+            if current["status"] != last_status:
+                last_status = current["status"]
+                yield sse_event("status", current)
+            if current["status"] in FINISHED:
+                return
+            await job_runner.wait_for_change(job_id, timeout=15)
+            current = await run_in_threadpool(job_runner.get, job_id)
+            if current["status"] == last_status:
+                # Keep idle proxies from closing the connection
+                yield b": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/generate-blog/stream")
+async def generate_blog_stream(request: GenerateBlogRequest):
+    """Streaming generate-blog: Server-Sent Events as the model writes.
+
+    Events: `token` ({"content"}) for each piece of cleaned text, then `done`
+    ({"success", "message", "blog_id"}) once the article is saved, or `error`
+    if the provider fails part-way through. Consume with fetch() and a stream
+    reader (EventSource cannot POST).
+    """
+    topic = request.topic.strip() or "your topic"
+    language = request.language or "English"
+    word_count = LENGTH_WORD_COUNTS.get(request.length, "800-1200 words")
+    caller = blog_caller(request.user_id)
+    # Reject before the stream starts, so the client gets a real 429. The slot itself is only
+    # taken once the body is iterated: a client gone before that would never release it.
+    scheduler.check(caller)
+
+    async def events():
+        try:
+            scheduler.admit(caller)
+        except QueueFull as e:
+            yield sse_event("error", {"success": False, "message": e.detail})
+            return
+        try:
+            async for event in generate_events():
+                yield event
+        finally:
+            scheduler.release(caller)
+
+    async def generate_events():
+        await run_in_threadpool(log_ai_usage, "blog_generator")
+
+        for provider, model in BLOG_CHAIN:
+            client = llm_clients.get(provider)
+            if not client or not breakers.allow(provider, model):
+                continue
+            breaker = breakers.get(provider, model)
+            messages = blog_prompt_messages(provider, topic, language, word_count)
+            await scheduler.acquire(provider, "generate_blog", caller, estimate_tokens(messages, 2000), BULK)
+            stripper = ImageTagStripper()
+            parts = []
+            started = False
+            request_started = time.perf_counter()
+            first_chunk_after = None
+            try:
+                stream = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=2000,
+                    stream=True,
+                )
+                try:
+                    async for chunk in stream:
+                        if first_chunk_after is None:
+                            first_chunk_after = time.perf_counter() - request_started
+                        if not chunk.choices:
+                            continue
+                        text = stripper.feed(chunk.choices[0].delta.content or "")
+                        if text:
+                            started = True
+                            parts.append(text)
+                            yield sse_event("token", {"content": text})
+                finally:
+                    await stream.close()
+            except Exception as e:
+                print(f"[AI] {provider} error in generate_blog_stream: {e}")
+                breaker.record(counts_as_failure(e), time.perf_counter() - request_started, e)
+                if started:
+                    # The client already has part of this article; don't splice in another model's
+                    yield sse_event("error", {"success": False, "message": f"Generation failed: {e}"})
+                    return
+                continue
+            # One breaker record per attempt, made once the stream has finished cleanly.
+            # Time to first token is the latency signal for a stream.
+            if first_chunk_after is None:
+                first_chunk_after = time.perf_counter() - request_started
+            breaker.record(False, first_chunk_after)
+
+            tail = stripper.flush()
+            if tail:
+                parts.append(tail)
+                yield sse_event("token", {"content": tail})
+            final_content = "".join(parts)
+            blog_id = await run_in_threadpool(save_generated_blog, topic, final_content, request.user_id)
+            yield sse_event("done", {
+                "success": True,
+                "message": f"Blog generated using {PROVIDER_NAMES[provider]} ({model}).",
+                "blog_id": blog_id,
+            })
+            return
+
+        # --- Fallback: local template, sent as a single token ---
+        content = template_blog(topic, request.length)
+        yield sse_event("token", {"content": content})
+        blog_id = await run_in_threadpool(save_generated_blog, topic, content, request.user_id)
+        yield sse_event("done", {"success": True, "message": TEMPLATE_BLOG_MESSAGE, "blog_id": blog_id})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Posts longer than this (estimated prompt tokens) are summarized section by section
+SUMMARY_CHUNK_TOKENS = int(os.getenv("AI_SUMMARY_CHUNK_TOKENS", "2000"))
+SUMMARY_CONCURRENCY = int(os.getenv("AI_SUMMARY_CONCURRENCY", "4"))
+MAX_REDUCE_ROUNDS = 3
+
+
+async def summarize_chunks(chunks: List[str], headers) -> List[Completion]:
+    """Summarize each chunk concurrently.
+
+    Chunk summaries go through the "summarize_chunk" tool, whose cache key is
+    the chunk text alone, so unchanged sections of an edited post are answered
+    from the AI response cache.
+    """
+    semaphore = asyncio.Semaphore(max(1, SUMMARY_CONCURRENCY))
+
+    async def summarize_chunk(chunk: str) -> Completion:
+        async with semaphore:
+            return await complete(
+                "summarize_chunk",
+                FAST_CHAIN,
+                [
+                    {"role": "system", "content": "You summarize one section of a longer blog post. Keep its key facts, names and numbers."},
+                    {"role": "user", "content": f"Summarize this section in 3–5 sentences:\n\n{chunk}"},
+                ],
+                headers=headers,
+                temperature=0.3,
+                max_tokens=300,
+            )
+
+    return list(await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks)))
+
+
+async def map_reduce_summary(text: str, headers) -> Tuple[Completion, int]:
+    """Summarize a long post: summarize its chunks, then combine the partial summaries.
+
+    Returns the final completion and the number of chunks the post was split into.
+    """
+    chunks = split_into_chunks(text, SUMMARY_CHUNK_TOKENS)
+    partials = [result.text for result in await summarize_chunks(chunks, headers)]
+
+    # Very long posts: collapse the partial summaries until they fit one prompt
+    for _ in range(MAX_REDUCE_ROUNDS):
+        if len(partials) <= 1 or count_tokens("\n\n".join(partials)) <= SUMMARY_CHUNK_TOKENS:
+            break
+        grouped = split_into_chunks("\n\n".join(partials), SUMMARY_CHUNK_TOKENS)
+        partials = [result.text for result in await summarize_chunks(grouped, headers)]
+
+    section_summaries = "\n\n".join(f"Section {i}:\n{partial}" for i, partial in enumerate(partials, 1))
+    result = await complete(
+        "summarize",
+        FAST_CHAIN,
+        [
+            {"role": "system", "content": "You are a helpful assistant that summarizes text clearly and concisely."},
+            {"role": "user", "content": f"These are summaries of consecutive sections of one blog post. Combine them into a single summary of the whole post in 2–3 short paragraphs:\n\n{section_summaries}"},
+        ],
+        headers=headers,
+        temperature=0.4,
+        max_tokens=500,
+    )
+    return result, len(chunks)
+
+
+@router.post("/summarize", response_model=SummaryResponse)
+async def summarize_blog(request: SummarizeRequest, http_request: Request):
     """Summarize text. Use Groq if available, then OpenAI, otherwise fallback."""
-    groq_client = get_groq_client()
-    openai_client = get_openai_client()
-    text = (request.content or "").strip()
+    return await summarize_text(request.content, http_request.headers)
+
+
+async def summarize_text(text: str, headers=None, fallback: bool = True) -> dict:
+    """Summary response for `text`.
+
+    Posts up to AI_LOCAL_SUMMARY_MAX_WORDS are summarized locally without any
+    AI call. Posts over SUMMARY_CHUNK_TOKENS are summarized map-reduce style
+    (see map_reduce_summary). When no provider answers, the local extractive
+    summary is returned, or LLMUnavailable raised if `fallback` is False.
+    """
+    text = (text or "").strip()
     if not text:
         return {
             "success": True,
@@ -355,85 +753,88 @@ def summarize_blog(request: SummarizeRequest):
     system_prompt = "You are a helpful assistant that summarizes text clearly and concisely."
     user_prompt = f"Summarize the following text in 2–3 short paragraphs:\n\n{text}"
 
-    # --- Try Groq first ---
-    if groq_client:
-        try:
-            resp = groq_client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.4,
-                max_tokens=500,
-            )
-            summary = resp.choices[0].message.content
-            return {
-                "success": True,
-                "summary": summary,
-                "message": "Summary generated using Groq (llama-3.1-8b-instant).",
-            }
-        except Exception as e:
-            print(f"[AI] Groq error in summarize_blog: {e}")
+    if summarizer.word_count(text) <= summarizer.LOCAL_SUMMARY_MAX_WORDS:
+        return {
+            "success": True,
+            "summary": summarizer.summarize(text),
+            "message": "Summary generated locally (extractive).",
+        }
 
-    # --- Try OpenAI next ---
-    if openai_client:
+    if count_tokens(text) > SUMMARY_CHUNK_TOKENS:
         try:
-            resp = openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.4,
-                max_tokens=500,
-            )
-            summary = resp.choices[0].message.content
+            result, sections = await map_reduce_summary(text, headers)
             return {
                 "success": True,
-                "summary": summary,
-                "message": "Summary generated using OpenAI (gpt-3.5-turbo).",
+                "summary": result.text,
+                "message": f"Summary generated using {result.label} from {sections} sections.",
             }
-        except Exception as e:
-            print(f"[AI] OpenAI error in summarize_blog: {e}")
+        except LLMUnavailable:
+            if not fallback:
+                raise
+            return local_summary(text)
+
+    # --- Try Groq first, then OpenAI ---
+    try:
+        result = await complete(
+            "summarize",
+            FAST_CHAIN,
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            headers=headers,
+            temperature=0.4,
+            max_tokens=500,
+        )
+        return {
+            "success": True,
+            "summary": result.text,
+            "message": f"Summary generated using {result.label}.",
+        }
+    except LLMUnavailable:
+        if not fallback:
+            raise
+        return local_summary(text)
 
-    # --- Fallback: simple local summary ---
-    # Take the first ~2–3 sentences as a crude “summary”.
-    sentences = [s.strip() for s in text.replace("\n", " ").split(".") if s.strip()]
-    summary = ". ".join(sentences[:3])
-    if len(sentences) > 3:
-        summary += "..."
 
+def local_summary(text: str) -> dict:
+    """Fallback when no AI provider answers: pick the most central sentences locally."""
     return {
         "success": True,
-        "summary": summary,
-        "message": "Summary generated using simple rule‑based logic.",
+        "summary": summarizer.summarize(text),
+        "message": "Summary generated locally (extractive; AI services not configured or failed).",
     }
 
 
-@router.post("/generate-headline")
-def generate_headline(request: HeadlineRequest):
+@router.post("/generate-headline", response_model=HeadlineResponse)
+async def generate_headline(request: HeadlineRequest, http_request: Request):
     """Generate headline ideas. Use Groq if available, then OpenAI, otherwise fallback."""
-    groq_client = get_groq_client()
-    openai_client = get_openai_client()
-    base = (request.content or "").strip() or "Your Topic"
+    return await headline_ideas(request.content, http_request.headers)
+
+
+async def headline_ideas(content: str, headers=None, fallback: bool = True) -> dict:
+    """Headline response with up to five title ideas for `content`.
+
+    Falls back to template headlines when no provider answers, or raises
+    LLMUnavailable if `fallback` is False.
+    """
+    base = (content or "").strip() or "Your Topic"
     # --- Pre-process: Extract topic if input is long ---
     if len(base) > 100:
         # Use AI to extract the core topic first
         try:
-             # Use a cheaper/faster model for extraction if possible, or just the same one
-            extract_resp = groq_client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[
+            extracted = await complete(
+                "headline",
+                (("groq", "llama-3.1-8b-instant"),),
+                [
                     {"role": "system", "content": "Extract the main topic from this text in 5-10 words. Do not explain, just state the topic."},
                     {"role": "user", "content": base},
                 ],
+                headers=headers,
                 max_tokens=50,
-            ) if groq_client else None
-            
-            if extract_resp:
-                base = extract_resp.choices[0].message.content.strip()
-        except Exception as e:
+            )
+            base = extracted.text.strip() or base[:100]
+        except LLMUnavailable as e:
             print(f"[AI] Error extracting topic: {e}")
             # Fallback: Just take first 100 chars
             base = base[:100]
@@ -446,57 +847,40 @@ def generate_headline(request: HeadlineRequest):
         # Remove numbering (1., 2., etc.)
         cleaned = []
         for l in lines:
-            if l[0].isdigit() and l[1] in ['.', ')']:
+            if len(l) > 1 and l[0].isdigit() and l[1] in ['.', ')']:
                 cleaned.append(l[2:].strip())
-            else:
+            elif l:
                 cleaned.append(l)
         return cleaned[:5]
 
-    # --- Try Groq first ---
-    if groq_client:
-        try:
-            resp = groq_client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.8,
-                max_tokens=200,
-            )
-            headlines = parse_headlines(resp.choices[0].message.content)
-            if headlines:
-                return {
-                    "success": True,
-                    "headlines": headlines,
-                    "message": "Headlines generated using Groq (llama3-8b-8192).",
-                }
-        except Exception as e:
-            print(f"[AI] Groq error in generate_headline: {e}")
+    # --- Try Groq first, then OpenAI ---
+    try:
+        result = await complete(
+            "headline",
+            FAST_CHAIN,
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            headers=headers,
+            temperature=0.8,
+            max_tokens=200,
+        )
+        headlines = parse_headlines(result.text)
+        if headlines:
+            return {
+                "success": True,
+                "headlines": headlines,
+                "message": f"Headlines generated using {result.label}.",
+            }
+    except LLMUnavailable:
+        pass
 
-    # --- Try OpenAI next ---
-    if openai_client:
-        try:
-            resp = openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.8,
-                max_tokens=200,
-            )
-            headlines = parse_headlines(resp.choices[0].message.content)
-            if headlines:
-                return {
-                    "success": True,
-                    "headlines": headlines,
-                    "message": "Headlines generated using OpenAI (gpt-3.5-turbo).",
-                }
-        except Exception as e:
-            print(f"[AI] OpenAI error in generate_headline: {e}")
+    if not fallback:
+        raise LLMUnavailable("No AI provider returned headlines")
 
     # --- Fallback: template headlines ---
+    short = base if len(base) <= 60 else base[:57].rstrip() + "..."
     headlines = [
         f"Everything You Need to Know About {short}",
         f"Getting Started with {short}",
@@ -512,34 +896,48 @@ def generate_headline(request: HeadlineRequest):
     }
 
 
+async def compute_derived_fields(content: str) -> tuple:
+    """Summary and headline ideas stored on a post after each write (see app/derived.py).
+
+    Raises LLMUnavailable rather than returning fallbacks, so the post stays pending until a provider answers.
+    """
+    summary, headlines = await asyncio.gather(
+        summarize_text(content, fallback=False), headline_ideas(content, fallback=False)
+    )
+    return summary["summary"], headlines["headlines"]
+
+
+derived_fields.set_handler(compute_derived_fields)
+
+
 # --- New Feature: Plagiarism/AI Detection ---
 class PlagiarismRequest(BaseModel):
     content: str
     language: Optional[str] = "English"
 
-@router.post("/plagiarism-check")
-def check_plagiarism(request: PlagiarismRequest):
-    groq_client = get_groq_client()
+@router.post("/plagiarism-check", response_model=PlagiarismResponse)
+async def check_plagiarism(request: PlagiarismRequest, http_request: Request):
     language = request.language or "English"
-    if not groq_client:
+    if not get_groq_client():
         raise HTTPException(status_code=500, detail="Groq API key missing")
     try:
         # Simulate checking by asking AI if it looks like AI generated
         # NOTE: This is NOT a real plagiarism checker (which requires searching the web).
         # It's a "AI Pattern Detector" simulation.
-        completion = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
+        result = await complete(
+            "plagiarism_check",
+            GROQ_LARGE,
+            [
                 {"role": "system", "content": f"You are an AI detection tool. Analyze the text for AI generation patterns. Provide an 'Originality Score' (0-100) and a brief analysis in {language}. Output format:\nScore: [Number]\nAnalysis: [Explanation]"},
                 {"role": "user", "content": f"Analyze this text:\n\n{request.content}"},
             ],
+            headers=http_request.headers,
             temperature=0.3,
             max_tokens=300,
         )
-        analysis_text = completion.choices[0].message.content
+        analysis_text = result.text
         
         # Parse the response
-        import re
         score_match = re.search(r'Score:\s*(\d+)', analysis_text)
         score = int(score_match.group(1)) if score_match else 50
         analysis_match = re.search(r'Analysis:\s*(.*)', analysis_text, re.DOTALL)
@@ -553,6 +951,8 @@ def check_plagiarism(request: PlagiarismRequest):
             "is_original": is_original,
             "message": f"Groq Analysis in {language}: {analysis}"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"[AI] Groq error in plagiarism_check: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -562,44 +962,117 @@ class GrammarCheckRequest(BaseModel):
     content: str
     language: Optional[str] = "English"
 
-@router.post("/grammar-check")
-def grammar_check(request: GrammarCheckRequest):
-    groq_client = get_groq_client()
+GRAMMAR_CONCURRENCY = int(os.getenv("AI_GRAMMAR_CONCURRENCY", "4"))
+TOKEN_RE = re.compile(r"\s+|[^\s]+")
+
+
+def word_corrections(original: str, corrected: str, offset: int) -> List[dict]:
+    """Word-level differences between a paragraph and its correction, as offsets into the full text."""
+    before = TOKEN_RE.findall(original)
+    after = TOKEN_RE.findall(corrected)
+    starts = [0]
+    for token in before:
+        starts.append(starts[-1] + len(token))
+    corrections = []
+    matcher = difflib.SequenceMatcher(None, before, after, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "equal":
+            continue
+        corrections.append({
+            "start": offset + starts[i1],
+            "end": offset + starts[i2],
+            "original": "".join(before[i1:i2]),
+            "replacement": "".join(after[j1:j2]),
+        })
+    return corrections
+
+
+@router.post("/grammar-check", response_model=GrammarCheckResponse)
+async def grammar_check(request: GrammarCheckRequest, http_request: Request):
+    """Fix grammar paragraph by paragraph.
+
+    Each paragraph is checked separately and concurrently, and the answers
+    are stored in the AI response cache under the paragraph text. While an
+    editor types, only the paragraphs that changed since the last check go
+    upstream. Code blocks are left alone. The response carries the merged
+    corrected text and word-level corrections with offsets into the
+    submitted content.
+    """
     language = request.language or "English"
-    if not groq_client:
+    if not get_groq_client():
         raise HTTPException(status_code=500, detail="Groq API key missing")
-    try:
-        completion = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": f"You are a strict grammar editor. Fix all grammar, spelling, punctuation, and awkward phrasing in the text. Return ONLY the corrected text. Do not add any explanations. Output in {language}."},
-                {"role": "user", "content": f"Original Text:\n{request.content}\n\nCorrected Text:"},
-            ],
-            temperature=0.2,
-            max_tokens=2000,
-        )
-        return {
-            "success": True,
-            "corrected_content": completion.choices[0].message.content,
-            "message": f"Grammar checked using Groq (llama-3.3-70b-versatile) in {language}.",
-        }
-    except Exception as e:
-        print(f"[AI] Groq error in grammar_check: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+
+    paragraphs = split_paragraphs(request.content)
+    semaphore = asyncio.Semaphore(max(1, GRAMMAR_CONCURRENCY))
+
+    async def check(paragraph: str) -> Completion:
+        async with semaphore:
+            return await complete(
+                "grammar_check",
+                GROQ_LARGE,
+                [
+                    {"role": "system", "content": f"You are a strict grammar editor. Fix all grammar, spelling, punctuation, and awkward phrasing in the text. Return ONLY the corrected text. Do not add any explanations. Output in {language}."},
+                    {"role": "user", "content": f"Original Text:\n{paragraph}\n\nCorrected Text:"},
+                ],
+                headers=http_request.headers,
+                temperature=0.2,
+                # Room for the paragraph plus some rewording, so the scheduler does not over-reserve
+                max_tokens=min(2000, 2 * count_tokens(paragraph) + 100),
+            )
+
+    checkable = [p for p, _ in paragraphs if p.strip() and not p.lstrip().startswith("```")]
+    unique = list(dict.fromkeys(checkable))
+    outcomes = dict(zip(unique, await asyncio.gather(*(check(p) for p in unique), return_exceptions=True)))
+
+    failures = [outcome for outcome in outcomes.values() if isinstance(outcome, BaseException)]
+    for failure in failures:
+        # A saturated scheduler (429) is the caller's to retry
+        if isinstance(failure, HTTPException):
+            raise failure
+    if unique and len(failures) == len(unique):
+        print(f"[AI] Groq error in grammar_check: {failures[0]}")
+        raise HTTPException(status_code=500, detail=str(failures[0]))
+
+    corrected_parts = []
+    corrections = []
+    offset = 0
+    label = None
+    for paragraph, separator in paragraphs:
+        outcome = outcomes.get(paragraph)
+        fixed = paragraph
+        if isinstance(outcome, Completion):
+            fixed = outcome.text.strip() or paragraph
+            label = label or outcome.label
+            corrections.extend(word_corrections(paragraph, fixed, offset))
+        corrected_parts.append(fixed + separator)
+        offset += len(paragraph) + len(separator)
+
+    checked = sum(1 for outcome in outcomes.values() if isinstance(outcome, Completion) and not outcome.cached)
+    message = f"Grammar checked using {label or 'Groq'} in {language}."
+    if failures:
+        message += f" {len(failures)} paragraph(s) could not be checked and were left unchanged."
+    return {
+        "success": True,
+        "corrected_content": "".join(corrected_parts),
+        "message": message,
+        "corrections": corrections,
+        "paragraphs": len(checkable),
+        "checked_paragraphs": checked,
+    }
 
 
 class ImageCaptionRequest(BaseModel):
     image_base64: str
     language: Optional[str] = "English"
 
-@router.post("/image-caption")
-def generate_image_caption(request: ImageCaptionRequest):
-    groq_client = get_groq_client()
+@router.post("/image-caption", response_model=CaptionResponse)
+async def generate_image_caption(request: ImageCaptionRequest):
     language = request.language or "English"
     try:
-        completion = groq_client.chat.completions.create(
-            model="llama-3.2-11b-vision-preview",
-            messages=[
+        result = await complete(
+            "image_caption",
+            (("groq", "llama-3.2-11b-vision-preview"),),
+            [
                 {
                     "role": "user",
                     "content": [
@@ -616,21 +1089,19 @@ def generate_image_caption(request: ImageCaptionRequest):
             temperature=0.5,
             max_tokens=500,
             top_p=1,
-            stream=False,
             stop=None,
         )
-        return {"caption": completion.choices[0].message.content}
+        return {"caption": result.text}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error generating caption: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate caption")
 
 
-@router.post("/analyze-image")
-def analyze_image(request: ImageAnalysisRequest):
+@router.post("/analyze-image", response_model=ImageAnalysisResponse)
+async def analyze_image(request: ImageAnalysisRequest):
     """Analyze an image to generate a detailed description for blog writing."""
-    groq_client = get_groq_client()
-    openai_client = get_openai_client()
-    
     # Reuse the ImageAnalysisRequest (image_base64)
     image_data = request.image_base64
     if "," in image_data:
@@ -638,73 +1109,41 @@ def analyze_image(request: ImageAnalysisRequest):
     
     system_prompt = "You are an expert visual analyst. Describe this image in great detail. Focus on the main subject, setting, colors, mood, and any text visible. The goal is to use this description to write a full blog post."
     user_prompt = "Describe this image in detail for a blog post."
+    image_message = {
+        "role": "user",
+        "content": [
+            {"type": "text", "text": user_prompt},
+            {
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:image/jpeg;base64,{image_data}"
+                },
+            },
+        ],
+    }
     
     # Log usage
-    log_ai_usage("image_analyzer")
-
-    last_error = "No clients available"
-
-    # --- Try Groq first (Llama Vision) ---
-    if groq_client:
-        try:
-            resp = groq_client.chat.completions.create(
-                model="meta-llama/llama-4-scout-17b-16e-instruct",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": user_prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_data}"
-                                },
-                            },
-                        ],
-                    }
-                ],
-                temperature=0.6,
-                max_tokens=500,
-            )
-            return {
-                "success": True,
-                "caption": resp.choices[0].message.content,
-                "message": "Image analysis generated using Groq Vision."
-            }
-        except Exception as e:
-            print(f"[AI] Groq Vision error in analyze: {e}")
-
-    # --- Try OpenAI next ---
-    if openai_client:
-        try:
-            resp = openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": user_prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_data}"
-                                },
-                            },
-                        ],
-                    }
-                ],
-                max_tokens=500,
-            )
-            return {
-                "success": True,
-                "caption": resp.choices[0].message.content,
-                "message": "Image analysis generated using OpenAI GPT-4o."
-            }
+    await run_in_threadpool(log_ai_usage, "image_analyzer")
 
-        except Exception as e:
-            print(f"[AI] OpenAI Vision error in analyze: {e}", flush=True)
-            last_error = str(e)
+    # --- Try Groq first (Llama Vision), then OpenAI GPT-4o ---
+    try:
+        result = await complete(
+            "image_analyzer",
+            VISION_CHAIN,
+            {
+                "groq": [image_message],
+                "openai": [{"role": "system", "content": system_prompt}, image_message],
+            },
+            temperature=0.6,
+            max_tokens=500,
+        )
+        return {
+            "success": True,
+            "caption": result.text,
+            "message": f"Image analysis generated using {result.label}."
+        }
+    except LLMUnavailable as e:
+        last_error = str(e)
 
     return {
         "success": False,
@@ -713,8 +1152,8 @@ def analyze_image(request: ImageAnalysisRequest):
     }
 
 
-@router.post("/generate-image")
-def generate_image(request: GenerateImageRequest):
+@router.post("/generate-image", response_model=MessageResponse)
+async def generate_image(request: GenerateImageRequest):
     """Image generation is disabled (requires OpenAI)."""
     return {
         "success": False,
@@ -725,8 +1164,8 @@ class TextToSpeechRequest(BaseModel):
     text: str
     voice: str = "alloy"
 
-@router.post("/text-to-speech")
-def text_to_speech(request: TextToSpeechRequest):
+@router.post("/text-to-speech", response_model=MessageResponse)
+async def text_to_speech(request: TextToSpeechRequest):
     """TTS is disabled (requires OpenAI)."""
     return {
         "success": False,
@@ -736,154 +1175,233 @@ def text_to_speech(request: TextToSpeechRequest):
 class TranslateRequest(BaseModel):
     text: str
     target_language: str
+    blog_id: Optional[int] = None # Reuse and store per-paragraph translations of this post
+
+TRANSLATE_CONCURRENCY = int(os.getenv("AI_TRANSLATE_CONCURRENCY", "4"))
 
-@router.post("/translate")
-def translate_text(request: TranslateRequest):
-    """Translate text using Groq."""
-    groq_client = get_groq_client()
-    if not groq_client:
-        raise HTTPException(status_code=500, detail="Groq API key missing")
 
+def load_stored_translations(blog_id: int, language: str, hashes: List[str]) -> tuple:
+    """(stored translations by paragraph hash, hashes of the post's current paragraphs)."""
+    db = SessionLocal()
     try:
-        completion = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"You are a professional translator. Translate the following text into {request.target_language}. Return ONLY the translated text, no explanations."
-                },
-                {"role": "user", "content": request.text},
-            ],
-            temperature=0.3,
-            max_tokens=2000,
-            top_p=1,
-        )
-        translated_text = completion.choices[0].message.content
-        return {"translated_text": translated_text}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        blog = db.query(models.Blog.content).filter(models.Blog.id == blog_id).first()
+        if not blog:
+            raise HTTPException(status_code=404, detail="Blog not found")
+        current = [paragraph_hash(p) for p, _ in split_paragraphs(blog.content)]
+        return translation_store.load_translations(db, blog_id, language, hashes), current
+    finally:
+        db.close()
 
 
+def save_translations(blog_id: int, language: str, translated: dict, keep: List[str]):
+    db = SessionLocal()
+    try:
+        translation_store.store_translations(db, blog_id, language, translated, keep)
+        db.commit()
+    finally:
+        db.close()
 
-class ToneRequest(BaseModel):
-    content: str
-    tone: str
 
-class GrammarCheckRequest(BaseModel):
-    content: str
+async def translate_paragraphs(text: str, language: str, headers=None, blog_id: Optional[int] = None) -> dict:
+    """Translate `text` paragraph by paragraph, concurrently, and stitch the result back together.
 
-@router.post("/grammar-check")
-def grammar_check(request: GrammarCheckRequest):
-    """Fix grammar and spelling errors."""
-    groq_client = get_groq_client()
-    openai_client = get_openai_client()
-    
-    content = request.content
-    
-    system_prompt = "You are an expert editor and proofreader. Fix all grammar, spelling, punctuation, and awkward phrasing in the text. Return ONLY the corrected text. Do not add any explanations."
-    user_prompt = f"Original Text:\n{content}\n\nCorrected Text:"
+    With a `blog_id`, paragraphs already translated for that post are reused
+    and only new or edited paragraphs are sent upstream; the new translations
+    are stored for the next edit and for GET /api/blog/{id}?lang=.
+    """
+    paragraphs = split_paragraphs(text)
+    hashes = [paragraph_hash(p) for p, _ in paragraphs if p.strip()]
 
-    # --- Try Groq first ---
-    if groq_client:
-        try:
-            resp = groq_client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.1, 
-                max_tokens=2000,
-            )
-            return {
-                "success": True,
-                "corrected_content": resp.choices[0].message.content,
-                "message": "Grammar checked using Groq."
-            }
-        except Exception as e:
-            print(f"[AI] Groq error in grammar_check: {e}")
+    stored, current = {}, []
+    if blog_id is not None:
+        stored, current = await run_in_threadpool(load_stored_translations, blog_id, language, hashes)
 
-    # --- Try OpenAI next ---
-    if openai_client:
-        try:
-            resp = openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
+    missing = {paragraph_hash(p): p for p, _ in paragraphs if p.strip()}
+    for digest in stored:
+        missing.pop(digest, None)
+    semaphore = asyncio.Semaphore(max(1, TRANSLATE_CONCURRENCY))
+
+    async def translate(paragraph: str) -> str:
+        async with semaphore:
+            result = await complete(
+                "translate",
+                GROQ_LARGE,
+                [
+                    {
+                        "role": "system",
+                        "content": f"You are a professional translator. Translate the following text into {language}. Return ONLY the translated text, no explanations."
+                    },
+                    {"role": "user", "content": paragraph},
                 ],
-                temperature=0.1,
+                headers=headers,
+                temperature=0.3,
                 max_tokens=2000,
+                top_p=1,
             )
-            return {
-                "success": True,
-                "corrected_content": resp.choices[0].message.content,
-                "message": "Grammar checked using OpenAI."
-            }
-        except Exception as e:
-            print(f"[AI] OpenAI error in grammar_check: {e}")
+            return result.text.strip()
 
-    return {
-        "success": False,
-        "corrected_content": content,
-        "message": "Could not check grammar. Backend error."
-    }
+    fresh = dict(zip(missing, await asyncio.gather(*(translate(p) for p in missing.values()))))
+    if blog_id is not None:
+        await run_in_threadpool(save_translations, blog_id, language, fresh, current + hashes)
+
+    translated_text, _, total = translation_store.stitch(paragraphs, {**stored, **fresh})
+    return {"translated_text": translated_text, "paragraphs": total, "reused_paragraphs": len(stored)}
+
+
+@router.post("/translate", response_model=TranslateResponse)
+async def translate_text(request: TranslateRequest, http_request: Request):
+    """Translate text using Groq, one paragraph at a time (see translate_paragraphs)."""
+    if not get_groq_client():
+        raise HTTPException(status_code=500, detail="Groq API key missing")
 
+    try:
+        return await translate_paragraphs(
+            request.text, request.target_language, http_request.headers, request.blog_id
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+class ToneRequest(BaseModel):
+    content: str
+    tone: str
 
-@router.post("/change-tone")
-def change_tone(request: ToneRequest):
+@router.post("/change-tone", response_model=ToneChangeResponse)
+async def change_tone(request: ToneRequest, http_request: Request):
     """Rewrite text in a specific tone."""
-    print(f"DEBUG: change_tone called with tone='{request.tone}'")
-    groq_client = get_groq_client()
-    openai_client = get_openai_client()
-    
     content = request.content
     tone = request.tone
     
     system_prompt = f"You are an expert editor. Rewrite the following text to have a '{tone}' tone. Keep the meaning the same, but change the style and vocabulary."
     user_prompt = f"Original Text:\n{content}\n\nRewritten Text ({tone}):"
 
-    # --- Try Groq first ---
-    if groq_client:
-        try:
-            resp = groq_client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.7,
-                max_tokens=1000,
-            )
-            return {
-                "success": True,
-                "content": resp.choices[0].message.content,
-                "message": f"Tone changed to {tone} using Groq.",
-            }
-        except Exception as e:
-            print(f"[AI] Groq error in change_tone: {e}")
-
-    # --- Try OpenAI next ---
-    if openai_client:
-        try:
-            resp = openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.7,
-                max_tokens=1000,
-            )
-            return {
-                "success": True,
-                "content": resp.choices[0].message.content,
-                "message": f"Tone changed to {tone} using OpenAI.",
-            }
-        except Exception as e:
-            print(f"[AI] OpenAI error in change_tone: {e}")
+    # --- Try Groq first, then OpenAI ---
+    try:
+        result = await complete(
+            "change_tone",
+            FAST_CHAIN,
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            headers=http_request.headers,
+            temperature=0.7,
+            max_tokens=1000,
+        )
+        return {
+            "success": True,
+            "content": result.text,
+            "message": f"Tone changed to {tone} using {result.provider_name}.",
+        }
+    except LLMUnavailable:
+        pass
 
     return {
         "success": False,
         "content": "Could not change tone. Please check backend logs.",
     }
+
+
+# --- Batch: run many text tools in one request ---
+
+# Tools the batch endpoint can run, by the route that serves them
+BATCH_ROUTES = {
+    "summarize": "/summarize",
+    "headline": "/generate-headline",
+    "translate": "/translate",
+    "change_tone": "/change-tone",
+    "grammar_check": "/grammar-check",
+    "plagiarism_check": "/plagiarism-check",
+}
+MAX_BATCH_ITEMS = 100
+DEFAULT_BATCH_CONCURRENCY = 8
+MAX_BATCH_CONCURRENCY = 16
+
+class BatchItem(BaseModel):
+    tool: str
+    payload: dict
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+    concurrency: Optional[int] = DEFAULT_BATCH_CONCURRENCY
+
+
+def batch_endpoint(tool: str):
+    """The endpoint function and request model serving `tool`, as the HTTP API would route it."""
+    path = BATCH_ROUTES.get(tool)
+    for route in router.routes:
+        # The first registration for a path is the one requests reach
+        if getattr(route, "path", None) == path and "POST" in getattr(route, "methods", ()):
+            return route.endpoint, inspect.signature(route.endpoint).parameters["request"].annotation
+    return None, None
+
+
+async def run_batch_item(index: int, item: BatchItem, http_request: Request, caller: str) -> dict:
+    caller_var.set(caller)
+    priority_var.set(BULK)
+    endpoint, request_model = batch_endpoint(item.tool)
+    if endpoint is None:
+        return {"index": index, "tool": item.tool, "success": False, "status": 400,
+                "error": f"Unknown tool. Use one of: {', '.join(BATCH_ROUTES)}"}
+    try:
+        payload = request_model.model_validate(item.payload)
+    except ValidationError as e:
+        return {"index": index, "tool": item.tool, "success": False, "status": 422, "error": str(e)}
+    try:
+        scheduler.admit(caller)
+    except HTTPException as e:
+        return {"index": index, "tool": item.tool, "success": False, "status": e.status_code, "error": str(e.detail)}
+    # One admission per item: the calls it fans out to (paragraphs, chunks) must not each take one
+    admitted_var.set(True)
+    try:
+        result = await endpoint(payload, http_request)
+    except HTTPException as e:
+        return {"index": index, "tool": item.tool, "success": False, "status": e.status_code, "error": str(e.detail)}
+    except Exception as e:
+        print(f"[AI] Batch item {index} ({item.tool}) failed: {e}")
+        return {"index": index, "tool": item.tool, "success": False, "status": 500, "error": str(e)}
+    finally:
+        scheduler.release(caller)
+    return {"index": index, "tool": item.tool, "success": result.get("success", True), "result": result}
+
+
+@router.post("/batch")
+async def run_batch(batch: BatchRequest, http_request: Request):
+    """Run up to 100 {tool, payload} items concurrently and stream results as NDJSON.
+
+    Each item goes through the same endpoint (and provider fallback, cache and
+    scheduler) as a single request, at bulk priority. One line is written per
+    item as soon as it finishes, tagged with its `index`, then a final
+    {"done": true, ...} summary line.
+    """
+    if not batch.items:
+        raise HTTPException(status_code=400, detail="No items to process")
+    if len(batch.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"A batch can contain at most {MAX_BATCH_ITEMS} items")
+    concurrency = max(1, min(batch.concurrency or DEFAULT_BATCH_CONCURRENCY, MAX_BATCH_CONCURRENCY))
+    caller = caller_var.get()
+
+    async def lines():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(index, item):
+            async with semaphore:
+                return await run_batch_item(index, item, http_request, caller)
+
+        tasks = [asyncio.create_task(run(index, item)) for index, item in enumerate(batch.items)]
+        succeeded = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                outcome = await finished
+                succeeded += 1 if outcome["success"] else 0
+                yield json.dumps(outcome, ensure_ascii=False).encode("utf-8") + b"\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+        summary = {"done": True, "total": len(tasks), "succeeded": succeeded, "failed": len(tasks) - succeeded}
+        yield json.dumps(summary).encode("utf-8") + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -16,7 +16,22 @@ class RegisterRequest(BaseModel):
     full_name: str
     role: str = "user" # Default to user
 
-@router.post("/login")
+class LoginResponse(BaseModel):
+    success: bool
+    user_id: int
+    full_name: str
+    role: str
+    message: str
+
+class RegisterResponse(BaseModel):
+    success: bool
+    message: str
+    user_id: int
+    email: str
+    full_name: str
+    role: str
+
+@router.post("/login", response_model=LoginResponse)
 def login(request: LoginRequest, db: Session = Depends(get_db)):
     try:
         # Try to query user - handle schema mismatch gracefully
@@ -65,7 +80,7 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
         print(f"[auth/login] Database error: {e}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}. Try running: python fix_db.py")
 
-@router.post("/register")
+@router.post("/register", response_model=RegisterResponse)
 def register(request: RegisterRequest, db: Session = Depends(get_db)):
     try:
         # Check if user already exists
@@ -1,14 +1,61 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator
 from typing import Optional, List
 from datetime import datetime
+import csv
+import hashlib
+import io
+import json
+import orjson
 
 router = APIRouter()
 
 from sqlalchemy.orm import Session
+from sqlalchemy import func, tuple_
 from fastapi import Depends
-from ..database import get_db
+from ..database import get_db, SessionLocal
 from .. import models
+from ..schemas import MessageResponse
+from .. import search as search_index
+from .. import tags as tag_index
+from .. import keywords as keyword_index
+from .. import translations as translation_store
+from ..llm.chunking import paragraph_hash, split_paragraphs
+from ..conditional import (
+    bump_collection_version,
+    get_collection_version,
+    http_date,
+    is_not_modified,
+    make_etag,
+    not_modified,
+    validator_headers,
+)
+from ..compression import CachedBody, encoded_etag
+from ..cache import read_cache
+from ..derived import derived_fields, stamp_content
+from ..pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    encode_cursor,
+    decode_cursor,
+    encode_offset_cursor,
+    decode_offset_cursor,
+)
+
+# Number of characters of `content` returned as the excerpt on listing cards
+EXCERPT_LENGTH = 200
+
+# Bulk import: rows per transaction, and the longest NDJSON line we will buffer
+DEFAULT_BULK_BATCH_SIZE = 500
+MAX_BULK_BATCH_SIZE = 5000
+MAX_BULK_LINE_BYTES = 5 * 1024 * 1024
+
+# Export: rows fetched per round trip from the server-side cursor, and rows per streamed chunk
+EXPORT_FETCH_SIZE = 1000
+EXPORT_CHUNK_ROWS = 200
+EXPORT_CSV_COLUMNS = ["id", "title", "content", "author", "user_id", "tags", "created_at", "updated_at", "cursor"]
 
 # In-memory storage REMOVED
 # blogs_db = []
@@ -23,93 +70,436 @@ class BlogCreate(BaseModel):
     tags: Optional[List[str]] = []
 
 
+class BulkBlogItem(BlogCreate):
+    # Imported posts may keep their original timestamps
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
 class BlogUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
     tags: Optional[List[str]] = None
 
 
+def _coerce_tags(value):
+    """Older rows may hold tags as a JSON or comma-separated string instead of a list."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            parsed = None
+        if isinstance(parsed, list):
+            return parsed
+        return [t.strip() for t in value.split(",") if t.strip()]
+    return value
+
+
 class BlogResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
-    title: str
-    content: str
-    author: str
-    user_id: Optional[int]
-    tags: List[str]
-    created_at: str
-    updated_at: str
+    title: Optional[str] = None
+    content: Optional[str] = None
+    author: Optional[str] = None
+    user_id: Optional[int] = None
+    tags: List[str] = []
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    # Precomputed after each write; null until the first computation finishes
+    word_count: Optional[int] = None
+    reading_time: Optional[int] = None
+    summary: Optional[str] = None
+    headline_suggestions: Optional[List[str]] = None
 
+    _normalize_tags = field_validator("tags", mode="before")(_coerce_tags)
 
-@router.get("/")
-def get_all_blogs(search: Optional[str] = None, db: Session = Depends(get_db)):
-    """Get all blogs, optionally filtered by search query"""
-    query = db.query(models.Blog)
-    
-    if search:
-        search_filter = f"%{search}%"
+
+class BlogCard(BaseModel):
+    id: int
+    title: Optional[str] = None
+    excerpt: str = ""
+    author: Optional[str] = None
+    user_id: Optional[int] = None
+    tags: List[str] = []
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    # Only present on search results
+    highlighted_title: Optional[str] = None
+    snippet: Optional[str] = None
+    score: Optional[float] = None
+
+    _normalize_tags = field_validator("tags", mode="before")(_coerce_tags)
+
+
+class BlogListResponse(BaseModel):
+    success: bool
+    blogs: List[BlogCard]
+    total: int
+    next_cursor: Optional[str] = None
+
+
+class BlogDetailResponse(BaseModel):
+    success: bool
+    blog: BlogResponse
+
+
+class TranslationInfo(BaseModel):
+    language: str
+    translated_paragraphs: int
+    total_paragraphs: int
+    complete: bool
+
+
+class TranslatedBlogResponse(BlogDetailResponse):
+    translation: TranslationInfo
+
+
+class BlogWriteResponse(BaseModel):
+    success: bool
+    message: str
+    blog: BlogResponse
+
+
+class BulkImportResult(BaseModel):
+    line: int
+    success: bool
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkImportResponse(BaseModel):
+    success: bool
+    total: int
+    imported: int
+    failed: int
+    results: List[BulkImportResult]
+
+
+class StatsOverviewResponse(BaseModel):
+    success: bool
+    stats: dict
+
+
+def _card_query(db: Session):
+    """Select only the columns a listing card needs; `content` is never loaded."""
+    return db.query(
+        models.Blog.id,
+        models.Blog.title,
+        func.substr(models.Blog.content, 1, EXCERPT_LENGTH).label("excerpt"),
+        models.Blog.author,
+        models.Blog.user_id,
+        models.Blog.tags,
+        models.Blog.created_at,
+        models.Blog.updated_at,
+    )
+
+
+def _paginate_cards(query, cursor: Optional[str], limit: int):
+    """Return one page of cards, newest first, using (created_at, id) as the keyset."""
+    if cursor:
+        created_at, blog_id = decode_cursor(cursor)
         query = query.filter(
-            (models.Blog.title.ilike(search_filter)) | 
-            (models.Blog.content.ilike(search_filter))
+            tuple_(models.Blog.created_at, models.Blog.id) < tuple_(created_at, blog_id)
         )
-    
-    blogs = query.order_by(models.Blog.created_at.desc()).all()
-    # Convert SQLAlchemy objects to dicts for JSON serialization
+
+    rows = (
+        query.order_by(models.Blog.created_at.desc(), models.Blog.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
     blogs_list = [
         {
-            "id": blog.id,
-            "title": blog.title,
-            "content": blog.content,
-            "author": blog.author,
-            "user_id": blog.user_id,
-            "tags": blog.tags if blog.tags else [],
-            "created_at": blog.created_at,
-            "updated_at": blog.updated_at
+            "id": row.id,
+            "title": row.title,
+            "excerpt": row.excerpt or "",
+            "author": row.author,
+            "user_id": row.user_id,
+            "tags": row.tags if row.tags else [],
+            "created_at": row.created_at,
+            "updated_at": row.updated_at
         }
-        for blog in blogs
+        for row in rows
     ]
     return {
         "success": True,
         "blogs": blogs_list,
-        "total": len(blogs_list)
+        "total": len(blogs_list),
+        "next_cursor": encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
     }
 
 
-@router.get("/{blog_id}")
-def get_blog(blog_id: int, db: Session = Depends(get_db)):
-    """Get a specific blog by ID"""
-    blog = db.query(models.Blog).filter(models.Blog.id == blog_id).first()
-    if not blog:
-        raise HTTPException(status_code=404, detail="Blog not found")
-    if not blog:
-        raise HTTPException(status_code=404, detail="Blog not found")
-    return {"success": True, "blog": blog}
+def _list_validators(request: Request, db: Session):
+    """ETag/Last-Modified for a listing: the blogs collection version plus the exact query."""
+    version, updated_at = get_collection_version(db)
+    etag = make_etag("blogs", version, request.url.path, request.url.query)
+    return etag, http_date(updated_at)
 
 
-@router.get("/user/{user_id}")
-def get_user_blogs(user_id: int, db: Session = Depends(get_db)):
-    """Get all blogs for a specific user"""
-    blogs = db.query(models.Blog).filter(models.Blog.user_id == user_id).order_by(models.Blog.created_at.desc()).all()
-    blogs_list = [
-        {
-            "id": blog.id,
-            "title": blog.title,
-            "content": blog.content,
-            "author": blog.author,
-            "user_id": blog.user_id,
-            "tags": blog.tags if blog.tags else [],
-            "created_at": blog.created_at,
-            "updated_at": blog.updated_at
-        }
-        for blog in blogs
-    ]
+def _cached_listing(request: Request, db: Session, load_page):
+    """Serve a listing page through the read cache, honoring conditional GETs.
+
+    The cache keeps the rendered JSON and its compressed variants, so repeat
+    reads skip both the query and serialization/compression.
+    """
+    def load():
+        etag, last_modified = _list_validators(request, db)
+        body = CachedBody.from_model(BlogListResponse, load_page(), exclude_unset=True)
+        return etag, last_modified, body
+
+    key = ("blog_list", request.url.path, request.url.query)
+    etag, last_modified, body = read_cache.get_or_load(key, load)
+    return _cached_response(request, etag, last_modified, body)
+
+
+def _cached_response(request: Request, etag: str, last_modified: Optional[str], body: CachedBody):
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(encoded_etag(etag, body.negotiate(request)), last_modified)
+    return body.response(request, validator_headers(etag, last_modified))
+
+
+def _blog_dict(blog) -> dict:
     return {
+        "id": blog.id,
+        "title": blog.title,
+        "content": blog.content,
+        "author": blog.author,
+        "user_id": blog.user_id,
+        "tags": blog.tags if blog.tags else [],
+        "created_at": blog.created_at,
+        "updated_at": blog.updated_at,
+        "word_count": blog.word_count,
+        "reading_time": blog.reading_time,
+        "summary": blog.summary,
+        "headline_suggestions": blog.headline_suggestions,
+    }
+
+
+def _invalidate_blog(blog_id: Optional[int] = None):
+    """Drop cached reads affected by a blog write. Profiles embed blog counts."""
+    if blog_id is not None:
+        read_cache.invalidate(("blog", blog_id))
+    read_cache.invalidate_prefix("blog_list", "user")
+
+
+@router.get("/", response_model=BlogListResponse, response_model_exclude_unset=True)
+def get_all_blogs(
+    request: Request,
+    search: Optional[str] = None,
+    tag: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    """Get a page of blog cards, optionally filtered by search query and/or tag.
+
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page.
+    Search results are ranked by relevance and include highlighted snippets.
+    """
+    def load_page():
+        tag_id = None
+        if tag:
+            tag_id = tag_index.find_tag_id(db, tag)
+            if tag_id is None:
+                return {"success": True, "blogs": [], "total": 0, "next_cursor": None}
+
+        if search:
+            offset = decode_offset_cursor(cursor) if cursor else 0
+            results = search_index.search_blogs(db, search, limit + 1, offset, tag_id=tag_id)
+            has_more = len(results) > limit
+            results = results[:limit]
+            return {
+                "success": True,
+                "blogs": results,
+                "total": len(results),
+                "next_cursor": encode_offset_cursor(offset + limit) if has_more else None
+            }
+
+        query = _card_query(db)
+        if tag_id is not None:
+            query = query.join(models.BlogTag, models.BlogTag.blog_id == models.Blog.id).filter(
+                models.BlogTag.tag_id == tag_id
+            )
+        return _paginate_cards(query, cursor, limit)
+
+    return _cached_listing(request, db, load_page)
+
+
+def _export_rows(
+    export_format: str,
+    user_id: Optional[int],
+    tag: Optional[str],
+    since: Optional[str],
+    until: Optional[str],
+    cursor: Optional[str],
+):
+    """Yield the export body in chunks, reading rows through a server-side cursor.
+
+    Runs with its own session because the response outlives the request's
+    dependency-managed one.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    db = SessionLocal()
+    try:
+        query = db.query(
+            models.Blog.id,
+            models.Blog.title,
+            models.Blog.content,
+            models.Blog.author,
+            models.Blog.user_id,
+            models.Blog.tags,
+            models.Blog.created_at,
+            models.Blog.updated_at,
+        )
+        if user_id is not None:
+            query = query.filter(models.Blog.user_id == user_id)
+        if tag:
+            tag_id = tag_index.find_tag_id(db, tag)
+            query = query.join(models.BlogTag, models.BlogTag.blog_id == models.Blog.id).filter(
+                models.BlogTag.tag_id == tag_id
+            )
+        if since:
+            query = query.filter(models.Blog.created_at >= since)
+        if until:
+            query = query.filter(models.Blog.created_at < until)
+        if after:
+            query = query.filter(tuple_(models.Blog.created_at, models.Blog.id) > tuple_(*after))
+        query = query.order_by(models.Blog.created_at, models.Blog.id).yield_per(EXPORT_FETCH_SIZE)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == "csv":
+            writer.writerow(EXPORT_CSV_COLUMNS)
+
+        pending = 0
+        chunks = []
+        for row in query:
+            record = {
+                "id": row.id,
+                "title": row.title,
+                "content": row.content,
+                "author": row.author,
+                "user_id": row.user_id,
+                "tags": row.tags if row.tags else [],
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+                # Pass back as `cursor` to resume after this row
+                "cursor": encode_cursor(row.created_at, row.id),
+            }
+            if export_format == "csv":
+                record["tags"] = json.dumps(record["tags"])
+                writer.writerow([record[column] for column in EXPORT_CSV_COLUMNS])
+            else:
+                chunks.append(orjson.dumps(record).decode("utf-8") + "\n")
+            pending += 1
+            if pending >= EXPORT_CHUNK_ROWS:
+                yield "".join(chunks) + buffer.getvalue()
+                chunks = []
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        yield "".join(chunks) + buffer.getvalue()
+    finally:
+        db.close()
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_blogs(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    user_id: Optional[int] = None,
+    tag: Optional[str] = None,
+    since: Optional[str] = Query(None, description="ISO timestamp; include posts created at or after it"),
+    until: Optional[str] = Query(None, description="ISO timestamp; include posts created before it"),
+    cursor: Optional[str] = Query(None, description="Resume after the row that carried this cursor"),
+):
+    """Stream the full blog corpus (content included) as NDJSON or CSV, oldest first.
+
+    Every row carries a `cursor`; pass the last one received to resume an
+    interrupted export.
+    """
+    if cursor:
+        decode_cursor(cursor)  # reject a malformed cursor before the stream starts
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(format, user_id, tag, since, until, cursor),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=blogs.{format}"},
+    )
+
+
+@router.get("/{blog_id}", response_model=BlogDetailResponse)
+def get_blog(blog_id: int, request: Request, lang: Optional[str] = None, db: Session = Depends(get_db)):
+    """Get a specific blog by ID.
+
+    With `lang`, the content comes back with every paragraph that has a stored
+    translation (see POST /api/ai/translate with a blog_id) swapped in; no AI
+    call is made, and untranslated paragraphs stay in the original language.
+    """
+    if lang:
+        return _translated_blog(blog_id, lang, request, db)
+
+    def load():
+        blog = db.query(models.Blog).filter(models.Blog.id == blog_id).first()
+        if not blog:
+            raise HTTPException(status_code=404, detail="Blog not found")
+        # Derived fields land after the write that triggered them, so they version the response too
+        return (
+            make_etag("blog", blog.id, blog.updated_at, blog.derived_at),
+            http_date(max(filter(None, (blog.updated_at, blog.derived_at)), default=None)),
+            CachedBody.from_model(BlogDetailResponse, {"success": True, "blog": _blog_dict(blog)}),
+        )
+
+    etag, last_modified, body = read_cache.get_or_load(("blog", blog_id), load)
+    return _cached_response(request, etag, last_modified, body)
+
+
+def _translated_blog(blog_id: int, lang: str, request: Request, db: Session):
+    blog = db.query(models.Blog).filter(models.Blog.id == blog_id).first()
+    if not blog:
+        raise HTTPException(status_code=404, detail="Blog not found")
+    paragraphs = split_paragraphs(blog.content or "")
+    stored = translation_store.load_translations(
+        db, blog_id, lang, (paragraph_hash(p) for p, _ in paragraphs if p.strip())
+    )
+    content, done, total = translation_store.stitch(paragraphs, stored)
+    payload = {
         "success": True,
-        "blogs": blogs_list,
-        "total": len(blogs_list)
+        "blog": {**_blog_dict(blog), "content": content},
+        "translation": {
+            "language": translation_store.normalize_language(lang),
+            "translated_paragraphs": done,
+            "total_paragraphs": total,
+            "complete": done == total,
+        },
     }
+    body = CachedBody.from_model(TranslatedBlogResponse, payload)
+    # Translations are stored outside the blog row, so validate on the rendered body
+    etag = make_etag("blog", blog.id, lang, hashlib.sha1(body.body).hexdigest())
+    return _cached_response(request, etag, None, body)
+
 
+@router.get("/user/{user_id}", response_model=BlogListResponse, response_model_exclude_unset=True)
+def get_user_blogs(
+    user_id: int,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    """Get a page of blog cards for a specific user"""
+    def load_page():
+        query = _card_query(db).filter(models.Blog.user_id == user_id)
+        return _paginate_cards(query, cursor, limit)
 
-@router.post("/create")
+    return _cached_listing(request, db, load_page)
+
+
+@router.post("/create", response_model=BlogWriteResponse)
 def create_blog(blog: BlogCreate, db: Session = Depends(get_db)):
     """Create a new blog post"""
     new_blog = models.Blog(
@@ -121,9 +511,17 @@ def create_blog(blog: BlogCreate, db: Session = Depends(get_db)):
         created_at=datetime.now().isoformat(),
         updated_at=datetime.now().isoformat()
     )
+    stamp_content(new_blog)
     db.add(new_blog)
+    db.flush()
+    search_index.index_blog(db, new_blog)
+    tag_index.sync_blog_tags(db, new_blog.id, new_blog.tags)
+    keyword_index.sync_blog_words(db, set(), keyword_index.blog_words(new_blog.title, new_blog.content))
+    bump_collection_version(db)
     db.commit()
     db.refresh(new_blog)
+    _invalidate_blog()
+    derived_fields.notify()
     return {
         "success": True,
         "message": "Blog created successfully",
@@ -131,23 +529,158 @@ def create_blog(blog: BlogCreate, db: Session = Depends(get_db)):
     }
 
 
-@router.put("/{blog_id}")
+def _insert_batch(db: Session, batch, derive: bool = False) -> List[dict]:
+    """Insert one batch of (line number, BulkBlogItem) in a single transaction."""
+    now = datetime.now().isoformat()
+    blogs = [
+        models.Blog(
+            title=item.title,
+            content=item.content,
+            author=item.author,
+            user_id=item.user_id,
+            tags=item.tags or [],
+            created_at=item.created_at or now,
+            updated_at=item.updated_at or item.created_at or now
+        )
+        for _, item in batch
+    ]
+    for blog in blogs:
+        stamp_content(blog, derive=derive)
+    try:
+        db.add_all(blogs)
+        db.flush()
+        search_index.index_blogs(db, blogs)
+        tag_index.add_tags_for_new_blogs(db, blogs)
+        keyword_index.add_words_for_new_blogs(db, blogs)
+        bump_collection_version(db)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"[blog/bulk] Batch insert failed: {e}")
+        return [{"line": line, "success": False, "error": f"Batch insert failed: {e}"} for line, _ in batch]
+    finally:
+        _invalidate_blog()
+    if derive:
+        derived_fields.notify()
+
+    results = [{"line": line, "success": True, "id": blog.id} for (line, _), blog in zip(batch, blogs)]
+    db.expunge_all()
+    return results
+
+
+def _parse_bulk_line(raw: bytes):
+    try:
+        return BulkBlogItem.model_validate_json(raw), None
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(loc) for loc in err['loc']) or 'line'}: {err['msg']}" for err in e.errors()
+        )
+
+
+@router.post("/bulk", response_model=BulkImportResponse, response_model_exclude_none=True)
+async def bulk_import_blogs(
+    request: Request,
+    batch_size: int = Query(DEFAULT_BULK_BATCH_SIZE, ge=1, le=MAX_BULK_BATCH_SIZE),
+    derive: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    """Import many posts from a streamed NDJSON body (one BlogCreate object per line).
+
+    The body is parsed incrementally and inserted in transactions of
+    `batch_size` posts, so memory use does not grow with the payload.
+    Lines that fail validation are reported and skipped; a batch that fails
+    to commit reports all of its lines as failed. Imported posts get their
+    word count and reading time; AI summaries and headline suggestions are
+    only queued for them with `derive=true` (an AI call or more per post).
+    """
+    results = []
+    batch = []
+    buffer = b""
+    line_no = 0
+    skipping = False  # inside an oversized line, discarding until its newline
+
+    async def flush():
+        nonlocal batch
+        if batch:
+            results.extend(await run_in_threadpool(_insert_batch, db, batch, derive))
+            batch = []
+
+    def take_line(raw: bytes):
+        nonlocal line_no
+        line_no += 1
+        if not raw.strip():
+            return
+        if len(raw) > MAX_BULK_LINE_BYTES:
+            results.append({"line": line_no, "success": False, "error": "Line too long"})
+            return
+        item, error = _parse_bulk_line(raw)
+        if error:
+            results.append({"line": line_no, "success": False, "error": error})
+        else:
+            batch.append((line_no, item))
+
+    async for chunk in request.stream():
+        if skipping:
+            # Rest of an oversized line (already reported): drop it up to its newline
+            newline = chunk.find(b"\n")
+            if newline < 0:
+                continue
+            chunk = chunk[newline + 1:]
+            skipping = False
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for raw in lines:
+            take_line(raw)
+            if len(batch) >= batch_size:
+                await flush()
+        if len(buffer) > MAX_BULK_LINE_BYTES:
+            line_no += 1
+            results.append({"line": line_no, "success": False, "error": "Line too long"})
+            buffer = b""
+            skipping = True
+
+    if buffer and not skipping:
+        take_line(buffer)
+    await flush()
+
+    results.sort(key=lambda r: r["line"])
+    imported = sum(1 for r in results if r["success"])
+    return {
+        "success": True,
+        "total": len(results),
+        "imported": imported,
+        "failed": len(results) - imported,
+        "results": results
+    }
+
+
+@router.put("/{blog_id}", response_model=BlogWriteResponse)
 def update_blog(blog_id: int, blog_update: BlogUpdate, db: Session = Depends(get_db)):
     """Update an existing blog"""
     blog = db.query(models.Blog).filter(models.Blog.id == blog_id).first()
     if not blog:
         raise HTTPException(status_code=404, detail="Blog not found")
     
+    text_changed = bool(blog_update.title or blog_update.content)
+    if text_changed:
+        old_words = keyword_index.blog_words(blog.title, blog.content)
     if blog_update.title:
         blog.title = blog_update.title
     if blog_update.content:
         blog.content = blog_update.content
     if blog_update.tags is not None:
         blog.tags = blog_update.tags
+        tag_index.sync_blog_tags(db, blog.id, blog.tags)
     
     blog.updated_at = datetime.now().isoformat()
+    stamp_content(blog)
+    search_index.index_blog(db, blog)
+    if text_changed:
+        keyword_index.sync_blog_words(db, old_words, keyword_index.blog_words(blog.title, blog.content))
+    bump_collection_version(db)
     db.commit()
     db.refresh(blog)
+    _invalidate_blog(blog_id)
+    derived_fields.notify()
     
     return {
         "success": True,
@@ -156,7 +689,7 @@ def update_blog(blog_id: int, blog_update: BlogUpdate, db: Session = Depends(get
     }
 
 
-@router.delete("/{blog_id}")
+@router.delete("/{blog_id}", response_model=MessageResponse)
 def delete_blog(blog_id: int, db: Session = Depends(get_db)):
     """Delete a blog post"""
     blog = db.query(models.Blog).filter(models.Blog.id == blog_id).first()
@@ -164,7 +697,14 @@ def delete_blog(blog_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Blog not found")
     
     db.delete(blog)
+    search_index.remove_blog(db, blog_id)
+    tag_index.remove_blog_tags(db, blog_id)
+    keyword_index.remove_blog_words(db, blog)
+    translation_store.remove_blog_translations(db, blog_id)
+    bump_collection_version(db)
     db.commit()
+    _invalidate_blog(blog_id)
+    read_cache.invalidate(("comments", blog_id))
     
     return {
         "success": True,
@@ -172,7 +712,7 @@ def delete_blog(blog_id: int, db: Session = Depends(get_db)):
     }
 
 
-@router.get("/stats/overview")
+@router.get("/stats/overview", response_model=StatsOverviewResponse)
 def get_stats():
     """Get dashboard statistics"""
     return {
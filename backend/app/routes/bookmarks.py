@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from ..database import get_db
 from .. import models
+from .blog import BlogResponse
 from pydantic import BaseModel
 from typing import List
 
@@ -11,7 +12,16 @@ class BookmarkRequest(BaseModel):
     user_id: int
     blog_id: int
 
-@router.post("/toggle")
+class BookmarkToggleResponse(BaseModel):
+    success: bool
+    bookmarked: bool
+    message: str
+
+class BookmarkListResponse(BaseModel):
+    success: bool
+    bookmarks: List[BlogResponse]
+
+@router.post("/toggle", response_model=BookmarkToggleResponse)
 def toggle_bookmark(request: BookmarkRequest, db: Session = Depends(get_db)):
     # Check if bookmark exists
     bookmark = db.query(models.Bookmark).filter(
@@ -31,7 +41,7 @@ def toggle_bookmark(request: BookmarkRequest, db: Session = Depends(get_db)):
         db.commit()
         return {"success": True, "bookmarked": True, "message": "Bookmark added"}
 
-@router.get("/{user_id}")
+@router.get("/{user_id}", response_model=BookmarkListResponse)
 def get_user_bookmarks(user_id: int, db: Session = Depends(get_db)):
     bookmarks = db.query(models.Bookmark).filter(models.Bookmark.user_id == user_id).all()
     
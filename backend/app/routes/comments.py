@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from ..database import get_db
 from .. import models
+from ..schemas import MessageResponse
+from ..cache import read_cache
 from pydantic import BaseModel
 from datetime import datetime
 from typing import List
@@ -36,15 +38,28 @@ def create_comment(blog_id: int, comment: CommentCreate, db: Session = Depends(g
     db.add(new_comment)
     db.commit()
     db.refresh(new_comment)
+    read_cache.invalidate(("comments", blog_id))
     return new_comment
 
 @router.get("/{blog_id}", response_model=List[CommentResponse])
 def get_comments(blog_id: int, db: Session = Depends(get_db)):
     """Get all comments for a blog post"""
-    comments = db.query(models.Comment).filter(models.Comment.blog_id == blog_id).order_by(models.Comment.created_at.desc()).all()
-    return comments
+    def load():
+        comments = db.query(models.Comment).filter(models.Comment.blog_id == blog_id).order_by(models.Comment.created_at.desc()).all()
+        return [
+            {
+                "id": comment.id,
+                "content": comment.content,
+                "author": comment.author,
+                "blog_id": comment.blog_id,
+                "created_at": comment.created_at
+            }
+            for comment in comments
+        ]
 
-@router.delete("/{comment_id}")
+    return read_cache.get_or_load(("comments", blog_id), load)
+
+@router.delete("/{comment_id}", response_model=MessageResponse)
 def delete_comment(comment_id: int, db: Session = Depends(get_db)):
     """Delete a comment"""
     comment = db.query(models.Comment).filter(models.Comment.id == comment_id).first()
@@ -53,4 +68,5 @@ def delete_comment(comment_id: int, db: Session = Depends(get_db)):
     
     db.delete(comment)
     db.commit()
+    read_cache.invalidate(("comments", comment.blog_id))
     return {"success": True, "message": "Comment deleted"}
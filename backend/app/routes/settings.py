@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import SystemConfig
+from ..schemas import MessageResponse
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -13,7 +14,17 @@ class SettingsUpdate(BaseModel):
     image_model: str
     image_style: str
 
-@router.get("/")
+class SettingsOut(BaseModel):
+    site_name: str
+    ai_model: str
+    image_model: str
+    image_style: str
+
+class SettingsResponse(BaseModel):
+    success: bool
+    settings: SettingsOut
+
+@router.get("/", response_model=SettingsResponse)
 def get_settings(db: Session = Depends(get_db)):
     config = db.query(SystemConfig).first()
     if not config:
@@ -33,7 +44,7 @@ def get_settings(db: Session = Depends(get_db)):
         }
     }
 
-@router.put("/")
+@router.put("/", response_model=MessageResponse)
 def update_settings(settings: SettingsUpdate, db: Session = Depends(get_db)):
     config = db.query(SystemConfig).first()
     if not config:
@@ -4,6 +4,8 @@ from pydantic import BaseModel
 from typing import Optional
 from ..database import get_db
 from .. import models
+from ..schemas import MessageResponse
+from ..cache import read_cache
 from datetime import datetime
 import shutil
 import os
@@ -27,11 +29,33 @@ class UserProfileResponse(BaseModel):
     created_at: str
     blog_count: int = 0
 
+class UserProfileSummary(BaseModel):
+    id: int
+    full_name: str
+    email: str
+    bio: str
+    avatar_url: str
+    social_links: dict
+
+class ProfileUpdateResponse(BaseModel):
+    success: bool
+    message: str
+    user: UserProfileSummary
+
+class AvatarUploadResponse(BaseModel):
+    success: bool
+    avatar_url: str
+
 # --- Endpoints ---
 
 @router.get("/{user_id}", response_model=UserProfileResponse)
 def get_user_profile(user_id: int, db: Session = Depends(get_db)):
     """Get user profile details."""
+    cached = read_cache.get(("user", user_id))
+    if cached is not None:
+        return cached
+    epoch = read_cache.epoch
+
     try:
         user = db.query(models.User).filter(models.User.id == user_id).first()
     except Exception as e:
@@ -64,7 +88,7 @@ def get_user_profile(user_id: int, db: Session = Depends(get_db)):
     except:
         blog_count = 0
 
-    return {
+    profile = {
         "id": user.id,
         "email": user.email,
         "full_name": user.full_name or "User",
@@ -74,8 +98,10 @@ def get_user_profile(user_id: int, db: Session = Depends(get_db)):
         "created_at": user.created_at or datetime.now().isoformat(),
         "blog_count": blog_count
     }
+    read_cache.set(("user", user_id), profile, epoch=epoch)
+    return profile
 
-@router.put("/{user_id}")
+@router.put("/{user_id}", response_model=ProfileUpdateResponse)
 def update_user_profile(user_id: int, profile: UserProfileUpdate, db: Session = Depends(get_db)):
     """Update user profile."""
     try:
@@ -94,6 +120,7 @@ def update_user_profile(user_id: int, profile: UserProfileUpdate, db: Session =
         
         db.commit()
         db.refresh(user)
+        read_cache.invalidate(("user", user_id))
         
         return {"success": True, "message": "Profile updated", "user": {
             "id": user.id,
@@ -107,7 +134,7 @@ def update_user_profile(user_id: int, profile: UserProfileUpdate, db: Session =
         print(f"[user/update] Error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to update profile: {str(e)}")
 
-@router.post("/{user_id}/avatar")
+@router.post("/{user_id}/avatar", response_model=AvatarUploadResponse)
 def upload_avatar(user_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
     """Upload user avatar."""
     try:
@@ -133,6 +160,7 @@ def upload_avatar(user_id: int, file: UploadFile = File(...), db: Session = Depe
             user.avatar_url = avatar_url
         db.commit()
         db.refresh(user)
+        read_cache.invalidate(("user", user_id))
         
         return {"success": True, "avatar_url": avatar_url}
     except Exception as e:
@@ -143,7 +171,7 @@ class UserPasswordUpdate(BaseModel):
     current_password: str
     new_password: str
 
-@router.put("/{user_id}/password")
+@router.put("/{user_id}/password", response_model=MessageResponse)
 def update_user_password(user_id: int, password_data: UserPasswordUpdate, db: Session = Depends(get_db)):
     """Update user password."""
     try:
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+# Shared response models used across routers
+class MessageResponse(BaseModel):
+    success: bool
+    message: str
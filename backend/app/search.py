@@ -0,0 +1,179 @@
+"""
+Full-text search over blog posts, backed by an SQLite FTS5 virtual table.
+
+`blogs_fts` keeps its own copy of title/content/tags/author with rowid equal
+to the blog id. Writers call index_blog() / remove_blog() in the same session
+as the blog change so the index commits (or rolls back) together with it.
+
+Highlighted titles and snippets are HTML: the post text is escaped and only
+the <mark> tags around matches are markup.
+"""
+import html
+import json
+import re
+from typing import Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from . import models
+
+FTS_TABLE = "blogs_fts"
+
+# bm25() column weights: title, content, tags, author
+BM25_WEIGHTS = "10.0, 1.0, 5.0, 2.0"
+
+SNIPPET_TOKENS = 16
+EXCERPT_LENGTH = 200
+
+# Private-use characters FTS5 wraps matches in; swapped for <mark> after escaping the text
+MATCH_OPEN = "\ue000"
+MATCH_CLOSE = "\ue001"
+
+
+def ensure_search_index(engine):
+    """Create the FTS5 table if it does not exist yet."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            "USING fts5(title, content, tags, author, tokenize='unicode61 remove_diacritics 2')"
+        ))
+
+
+def _tags_text(tags) -> str:
+    if isinstance(tags, list):
+        return " ".join(str(t) for t in tags)
+    return str(tags or "")
+
+
+def index_blogs(db: Session, blogs: Iterable):
+    """Insert or replace the index entries for several blogs at once. Caller commits."""
+    params = [
+        {
+            "id": blog.id,
+            "title": blog.title or "",
+            "content": blog.content or "",
+            "tags": _tags_text(blog.tags),
+            "author": blog.author or "",
+        }
+        for blog in blogs
+    ]
+    if not params:
+        return
+    db.execute(
+        text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"),
+        [{"id": p["id"]} for p in params],
+    )
+    db.execute(
+        text(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, content, tags, author) "
+            "VALUES (:id, :title, :content, :tags, :author)"
+        ),
+        params,
+    )
+
+
+def index_blog(db: Session, blog):
+    """Insert or replace the index entry for a blog. Caller commits."""
+    index_blogs(db, [blog])
+
+
+def remove_blog(db: Session, blog_id: int):
+    """Drop a blog from the index. Caller commits."""
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": blog_id})
+
+
+def build_match_query(search: str) -> str:
+    """Turn free-form user input into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so "mach learn" matches
+    "machine learning" and FTS5 operators in the input are never interpreted.
+    """
+    terms = re.findall(r"\w+", search or "")
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _marked_html(marked: Optional[str]) -> Optional[str]:
+    """Escape FTS5 highlight()/snippet() output, turning only the match markers into <mark> tags."""
+    if marked is None:
+        return None
+    return html.escape(marked).replace(MATCH_OPEN, "<mark>").replace(MATCH_CLOSE, "</mark>")
+
+
+def search_blogs(
+    db: Session, search: str, limit: int, offset: int = 0, tag_id: Optional[int] = None
+) -> List[dict]:
+    """Return BM25-ranked matches as card dicts with highlighted title and snippet.
+
+    When tag_id is given, only blogs carrying that tag are returned.
+    """
+    match = build_match_query(search)
+    if not match:
+        return []
+
+    tag_filter = ""
+    params = {"match": match, "limit": limit, "offset": offset, "open": MATCH_OPEN, "close": MATCH_CLOSE}
+    if tag_id is not None:
+        tag_filter = "AND b.id IN (SELECT blog_id FROM blog_tags WHERE tag_id = :tag_id) "
+        params["tag_id"] = tag_id
+
+    rows = db.execute(
+        text(
+            "SELECT b.id, b.title, b.author, b.user_id, b.tags, b.created_at, b.updated_at, "
+            f"substr(b.content, 1, {EXCERPT_LENGTH}) AS excerpt, "
+            f"highlight({FTS_TABLE}, 0, :open, :close) AS highlighted_title, "
+            f"snippet({FTS_TABLE}, 1, :open, :close, '…', {SNIPPET_TOKENS}) AS snippet, "
+            f"bm25({FTS_TABLE}, {BM25_WEIGHTS}) AS rank "
+            f"FROM {FTS_TABLE} JOIN blogs b ON b.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :match "
+            f"{tag_filter}"
+            "ORDER BY rank, b.id DESC LIMIT :limit OFFSET :offset"
+        ),
+        params,
+    ).mappings().all()
+
+    results = []
+    for row in rows:
+        tags = row["tags"]
+        if isinstance(tags, str):
+            try:
+                tags = json.loads(tags)
+            except ValueError:
+                tags = []
+        results.append({
+            "id": row["id"],
+            "title": row["title"],
+            "excerpt": row["excerpt"] or "",
+            "author": row["author"],
+            "user_id": row["user_id"],
+            "tags": tags or [],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "highlighted_title": _marked_html(row["highlighted_title"]),
+            "snippet": _marked_html(row["snippet"]),
+            "score": -row["rank"],
+        })
+    return results
+
+
+def rebuild_search_index(db: Session, batch_size: int = 500) -> int:
+    """Re-index every blog from scratch. Returns the number of indexed posts."""
+    db.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    count = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(models.Blog)
+            .filter(models.Blog.id > last_id)
+            .order_by(models.Blog.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        index_blogs(db, batch)
+        count += len(batch)
+        last_id = batch[-1].id
+        db.expunge_all()
+    db.commit()
+    return count
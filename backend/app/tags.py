@@ -0,0 +1,161 @@
+"""
+Normalized tag index.
+
+`Blog.tags` (JSON) stays the source of truth for display; `tags` and
+`blog_tags` mirror it so listings can filter by tag through an index and the
+admin category chart can read precomputed per-tag counts. Writers call
+sync_blog_tags() / remove_blog_tags() in the same session as the blog change.
+"""
+import json
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from . import models
+
+
+def normalize_tag(tag) -> str:
+    """Canonical form used for storage and lookups: trimmed, Title Case."""
+    if not isinstance(tag, str):
+        return ""
+    return tag.strip().title()
+
+
+def parse_tags(raw) -> List[str]:
+    """Coerce whatever is stored in Blog.tags into a list of normalized, unique names.
+
+    Older rows may hold a JSON string ('["AI Generated"]') or a plain
+    comma-separated string instead of a list.
+    """
+    if isinstance(raw, str):
+        try:
+            parsed = json.loads(raw)
+        except ValueError:
+            parsed = None
+        raw = parsed if isinstance(parsed, list) else raw.split(",")
+    if not isinstance(raw, list):
+        return []
+
+    names = []
+    for tag in raw:
+        name = normalize_tag(tag)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _tag_ids(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """Return {name: id} for the given names, creating missing tags."""
+    names = list(names)
+    if not names:
+        return {}
+    db.execute(
+        insert(models.Tag)
+        .values([{"name": name, "blog_count": 0} for name in names])
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+    rows = db.query(models.Tag.id, models.Tag.name).filter(models.Tag.name.in_(names)).all()
+    return {row.name: row.id for row in rows}
+
+
+def _adjust_counts(db: Session, tag_ids: Iterable[int], delta: int):
+    tag_ids = list(tag_ids)
+    if tag_ids:
+        db.query(models.Tag).filter(models.Tag.id.in_(tag_ids)).update(
+            {models.Tag.blog_count: models.Tag.blog_count + delta},
+            synchronize_session=False,
+        )
+
+
+def sync_blog_tags(db: Session, blog_id: int, raw_tags):
+    """Make blog_tags match the blog's tag list and adjust counts by the difference. Caller commits."""
+    wanted = set(_tag_ids(db, parse_tags(raw_tags)).values())
+    current = {
+        row.tag_id
+        for row in db.query(models.BlogTag.tag_id).filter(models.BlogTag.blog_id == blog_id)
+    }
+
+    added = wanted - current
+    removed = current - wanted
+    if removed:
+        db.query(models.BlogTag).filter(
+            models.BlogTag.blog_id == blog_id,
+            models.BlogTag.tag_id.in_(removed),
+        ).delete(synchronize_session=False)
+        _adjust_counts(db, removed, -1)
+    if added:
+        db.execute(
+            insert(models.BlogTag).values([{"blog_id": blog_id, "tag_id": tag_id} for tag_id in added])
+        )
+        _adjust_counts(db, added, 1)
+
+
+def add_tags_for_new_blogs(db: Session, blogs: Iterable):
+    """Bulk variant of sync_blog_tags for freshly inserted blogs (no existing links). Caller commits."""
+    per_blog = {blog.id: parse_tags(blog.tags) for blog in blogs}
+    ids = _tag_ids(db, {name for names in per_blog.values() for name in names})
+    rows = [
+        {"blog_id": blog_id, "tag_id": ids[name]}
+        for blog_id, names in per_blog.items()
+        for name in names
+    ]
+    if not rows:
+        return
+    db.execute(insert(models.BlogTag), rows)
+
+    # One UPDATE per distinct increment rather than one per tag
+    by_delta = defaultdict(list)
+    for tag_id, delta in Counter(row["tag_id"] for row in rows).items():
+        by_delta[delta].append(tag_id)
+    for delta, tag_ids in by_delta.items():
+        _adjust_counts(db, tag_ids, delta)
+
+
+def remove_blog_tags(db: Session, blog_id: int):
+    """Drop a blog's tag links and decrement their counts. Caller commits."""
+    sync_blog_tags(db, blog_id, [])
+
+
+def find_tag_id(db: Session, tag: str) -> Optional[int]:
+    """Look up a tag by (un-normalized) name."""
+    row = db.query(models.Tag.id).filter(models.Tag.name == normalize_tag(tag)).first()
+    return row.id if row else None
+
+
+def top_tags(db: Session, limit: int = 5) -> List[dict]:
+    """Most used tags, read straight off the blog_count index."""
+    rows = (
+        db.query(models.Tag.name, models.Tag.blog_count)
+        .filter(models.Tag.blog_count > 0)
+        .order_by(models.Tag.blog_count.desc(), models.Tag.name)
+        .limit(limit)
+        .all()
+    )
+    return [{"name": row.name, "value": row.blog_count} for row in rows]
+
+
+def rebuild_tag_index(db: Session, batch_size: int = 500) -> int:
+    """Rebuild tags/blog_tags from Blog.tags. Returns the number of blogs processed."""
+    db.query(models.BlogTag).delete(synchronize_session=False)
+    db.query(models.Tag).delete(synchronize_session=False)
+
+    count = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(models.Blog.id, models.Blog.tags)
+            .filter(models.Blog.id > last_id)
+            .order_by(models.Blog.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        for row in batch:
+            sync_blog_tags(db, row.id, row.tags)
+        count += len(batch)
+        last_id = batch[-1].id
+    db.commit()
+    return count
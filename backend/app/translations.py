@@ -0,0 +1,91 @@
+"""
+Stored paragraph translations of blog posts.
+
+`blog_translations` holds one row per (blog, language, source paragraph
+hash). Translating a post again only sends the paragraphs whose text changed
+(routes/ai.py translate_paragraphs), and GET /api/blog/{id}?lang= stitches
+the stored rows back into the post without any AI call. Writers call
+remove_blog_translations() in the same session when a blog is deleted.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from . import models
+from .llm.chunking import paragraph_hash
+
+# ISO 639-1 codes accepted by ?lang=, mapped to the names the translate tool is given
+LANGUAGE_CODES = {
+    "ar": "arabic", "bn": "bengali", "de": "german", "en": "english", "es": "spanish",
+    "fr": "french", "hi": "hindi", "id": "indonesian", "it": "italian", "ja": "japanese",
+    "kn": "kannada", "ko": "korean", "ml": "malayalam", "mr": "marathi", "nl": "dutch",
+    "pl": "polish", "pt": "portuguese", "ru": "russian", "ta": "tamil", "te": "telugu",
+    "tr": "turkish", "uk": "ukrainian", "ur": "urdu", "vi": "vietnamese", "zh": "chinese",
+}
+
+
+def normalize_language(language: str) -> str:
+    """Storage key for a language: "fr", "French" and " french " are all "french"."""
+    key = (language or "").strip().lower()
+    return LANGUAGE_CODES.get(key, key)
+
+
+def load_translations(db: Session, blog_id: int, language: str, hashes: Iterable[str]) -> Dict[str, str]:
+    """Stored translations of the given paragraph hashes, keyed by hash."""
+    hashes = list(set(hashes))
+    if not hashes:
+        return {}
+    T = models.BlogTranslation
+    rows = (
+        db.query(T.paragraph_hash, T.translated)
+        .filter(T.blog_id == blog_id, T.language == normalize_language(language), T.paragraph_hash.in_(hashes))
+        .all()
+    )
+    return {row.paragraph_hash: row.translated for row in rows}
+
+
+def store_translations(db: Session, blog_id: int, language: str, translated: Dict[str, str], keep: Iterable[str]):
+    """Upsert new paragraph translations and drop those of paragraphs no longer in the post. Caller commits."""
+    language = normalize_language(language)
+    T = models.BlogTranslation
+    if translated:
+        now = datetime.now().isoformat()
+        statement = insert(T).values([
+            {"blog_id": blog_id, "language": language, "paragraph_hash": digest, "translated": text, "created_at": now}
+            for digest, text in translated.items()
+        ])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["blog_id", "language", "paragraph_hash"],
+            set_={"translated": statement.excluded.translated, "created_at": statement.excluded.created_at},
+        ))
+    db.query(T).filter(
+        T.blog_id == blog_id, T.language == language, T.paragraph_hash.notin_(list(set(keep)))
+    ).delete(synchronize_session=False)
+
+
+def remove_blog_translations(db: Session, blog_id: int):
+    """Drop every stored translation of a blog. Caller commits."""
+    db.query(models.BlogTranslation).filter(models.BlogTranslation.blog_id == blog_id).delete(
+        synchronize_session=False
+    )
+
+
+def stitch(paragraphs: List[Tuple[str, str]], translated: Dict[str, str]) -> Tuple[str, int, int]:
+    """Rebuild a text from its paragraphs, using translations where available.
+
+    Returns (text, translated paragraphs, paragraphs that needed translating);
+    blank paragraphs are kept as they are and not counted.
+    """
+    out = []
+    done = total = 0
+    for paragraph, separator in paragraphs:
+        if paragraph.strip():
+            total += 1
+            translation = translated.get(paragraph_hash(paragraph))
+            if translation is not None:
+                done += 1
+                paragraph = translation
+        out.append(paragraph + separator)
+    return "".join(out), done, total
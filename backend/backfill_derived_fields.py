@@ -0,0 +1,46 @@
+"""
+One-shot backfill of the precomputed blog fields (word count, reading time,
+summary, headline suggestions).
+Run this once on databases created before these fields were added: it stamps
+every post's content hash and reading stats and marks it pending, and the
+running API's background worker then fills in the AI-derived fields.
+"""
+import sys
+import os
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import models
+from app.database import SessionLocal, engine
+from app.derived import ensure_derived_columns, stamp_content
+
+BATCH_SIZE = 500
+
+ensure_derived_columns(engine)
+db = SessionLocal()
+try:
+    count = 0
+    last_id = 0
+    while True:
+        blogs = (
+            db.query(models.Blog)
+            .filter(models.Blog.id > last_id)
+            .order_by(models.Blog.id)
+            .limit(BATCH_SIZE)
+            .all()
+        )
+        if not blogs:
+            break
+        for blog in blogs:
+            stamp_content(blog)
+        db.commit()
+        count += len(blogs)
+        last_id = blogs[-1].id
+        db.expunge_all()
+    print(f"✅ Stamped {count} blogs; the API will compute their summaries and headlines in the background.")
+except Exception as e:
+    db.rollback()
+    print(f"❌ Error: {e}")
+finally:
+    db.close()
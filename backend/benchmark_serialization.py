@@ -0,0 +1,81 @@
+"""
+Benchmark JSON serialization of a 10k-post blog listing.
+
+"before": the old path for routes without a response model - FastAPI's
+jsonable_encoder walks the payload in Python, then JSONResponse runs json.dumps.
+"after": the current path - the response model validates the payload and
+pydantic-core writes the JSON bytes, as FastAPI does for routes with a
+response model.
+
+Usage: python benchmark_serialization.py [num_posts]
+"""
+import sys
+import os
+import time
+from typing import List
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.routes.blog import BlogResponse
+
+NUM_POSTS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+ROUNDS = 5
+
+
+class BlogListing(BaseModel):
+    success: bool
+    blogs: List[BlogResponse]
+    total: int
+
+
+def make_payload(n):
+    paragraph = (
+        "## Section\n\nArtificial intelligence is reshaping how we write, edit and publish. "
+        "**Models** summarize, translate and check grammar in seconds.\n\n"
+    )
+    blogs = [
+        {
+            "id": i,
+            "title": f"Post number {i}",
+            "content": paragraph * 12,
+            "author": "Benchmark",
+            "user_id": i % 50,
+            "tags": ["AI", "Writing", f"Tag{i % 20}"],
+            "created_at": "2026-01-01T12:00:00.000000",
+            "updated_at": "2026-01-02T12:00:00.000000",
+        }
+        for i in range(n)
+    ]
+    return {"success": True, "blogs": blogs, "total": n}
+
+
+def before(payload):
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def after(payload):
+    return BlogListing.model_validate(payload).model_dump_json().encode("utf-8")
+
+
+def timeit(fn, payload):
+    best = float("inf")
+    size = 0
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        size = len(fn(payload))
+        best = min(best, time.perf_counter() - start)
+    return best, size
+
+
+payload = make_payload(NUM_POSTS)
+print(f"Serializing a {NUM_POSTS}-post listing (best of {ROUNDS} rounds)")
+t_before, size_before = timeit(before, payload)
+print(f"before (jsonable_encoder + json): {t_before * 1000:8.1f} ms  {size_before / 1e6:.1f} MB")
+t_after, size_after = timeit(after, payload)
+print(f"after  (response model, pydantic-core): {t_after * 1000:8.1f} ms  {size_after / 1e6:.1f} MB")
+print(f"speedup: {t_before / t_after:.1f}x")
@@ -0,0 +1,26 @@
+"""
+One-shot rebuild of the keyword document frequencies (keyword_terms table)
+used for local keyword extraction and auto-tagging.
+Run this once on databases created before the table was added,
+or any time the counts look out of sync with the blogs table.
+"""
+import sys
+import os
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal, engine
+from app import models
+from app.keywords import rebuild_keyword_index
+
+models.Base.metadata.create_all(bind=engine)
+db = SessionLocal()
+try:
+    count = rebuild_keyword_index(db)
+    print(f"✅ Rebuilt keyword index for {count} blogs.")
+except Exception as e:
+    db.rollback()
+    print(f"❌ Error: {e}")
+finally:
+    db.close()
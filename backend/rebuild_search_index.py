@@ -0,0 +1,24 @@
+"""
+One-shot rebuild of the blog full-text search index.
+Run this once on databases created before search indexing was added,
+or any time the index looks out of sync with the blogs table.
+"""
+import sys
+import os
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal, engine
+from app.search import ensure_search_index, rebuild_search_index
+
+ensure_search_index(engine)
+db = SessionLocal()
+try:
+    count = rebuild_search_index(db)
+    print(f"✅ Indexed {count} blogs for full-text search.")
+except Exception as e:
+    db.rollback()
+    print(f"❌ Error: {e}")
+finally:
+    db.close()
@@ -0,0 +1,25 @@
+"""
+One-shot rebuild of the normalized tag index (tags / blog_tags tables).
+Run this once on databases created before the tag index was added,
+or any time tag counts look out of sync with the blogs table.
+"""
+import sys
+import os
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal, engine
+from app import models
+from app.tags import rebuild_tag_index
+
+models.Base.metadata.create_all(bind=engine)
+db = SessionLocal()
+try:
+    count = rebuild_tag_index(db)
+    print(f"✅ Rebuilt tag index for {count} blogs.")
+except Exception as e:
+    db.rollback()
+    print(f"❌ Error: {e}")
+finally:
+    db.close()
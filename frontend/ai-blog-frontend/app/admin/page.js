@@ -174,26 +174,57 @@ export default function AdminDashboard() {
 
   const ManageBlogsView = () => {
     const [blogs, setBlogs] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    // Pages shown so far; a refresh re-reads all of them so "Load more" results are kept
+    const pagesLoaded = useRef(1);
+
+    const fetchPage = async (cursor) => {
+      const params = new URLSearchParams({ limit: "50" });
+      if (cursor) params.set("cursor", cursor);
+      const res = await fetch(`${API_BASE_URL}/api/blog/?${params}`);
+      if (!res.ok) {
+        console.error("Blogs API error:", res.status, res.statusText);
+        return null;
+      }
+      const data = await res.json();
+      if (!data.success) {
+        console.error("Blogs API returned success=false:", data);
+        return null;
+      }
+      return data;
+    };
 
     const fetchBlogs = async () => {
       try {
-        const res = await fetch(`${API_BASE_URL}/api/blog/`);
-        if (!res.ok) {
-          console.error("Blogs API error:", res.status, res.statusText);
-          return;
-        }
-        const data = await res.json();
-        if (data.success) {
-          console.log(`Fetched ${data.blogs?.length || 0} blogs`);
-          setBlogs(data.blogs || []);
-        } else {
-          console.error("Blogs API returned success=false:", data);
+        const all = [];
+        let cursor = null;
+        for (let page = 0; page < pagesLoaded.current; page++) {
+          const data = await fetchPage(cursor);
+          if (!data) return;
+          all.push(...(data.blogs || []));
+          cursor = data.next_cursor;
+          if (!cursor) break;
         }
+        console.log(`Fetched ${all.length} blogs`);
+        setBlogs(all);
+        setNextCursor(cursor);
       } catch (e) {
         console.error("Fetch blogs failed", e);
       }
     };
 
+    const loadMore = async () => {
+      try {
+        const data = await fetchPage(nextCursor);
+        if (!data) return;
+        pagesLoaded.current += 1;
+        setBlogs(prev => [...prev, ...(data.blogs || [])]);
+        setNextCursor(data.next_cursor);
+      } catch (e) {
+        console.error("Load more blogs failed", e);
+      }
+    };
+
     const handleDelete = async (id) => {
       if (!confirm("Are you sure you want to delete this blog?")) return;
       try {
@@ -245,6 +276,16 @@ export default function AdminDashboard() {
             {blogs.length === 0 && <tr><td colSpan="5" style={{ padding: "2rem", textAlign: "center" }}>No blogs found.</td></tr>}
           </tbody>
         </table>
+        {nextCursor && (
+          <div style={{ textAlign: "center", marginTop: "1.5rem" }}>
+            <button
+              onClick={loadMore}
+              style={{ background: "rgba(59, 130, 246, 0.2)", color: "#60a5fa", border: "1px solid rgba(59, 130, 246, 0.3)", padding: "0.5rem 1.5rem", borderRadius: "0.5rem", cursor: "pointer", fontWeight: "500" }}
+            >
+              Load more
+            </button>
+          </div>
+        )}
       </div>
     );
   };
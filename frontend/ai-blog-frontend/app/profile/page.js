@@ -58,7 +58,7 @@ export default function ProfilePage() {
                     bio: data.bio || "",
                     social_links: data.social_links || { twitter: "", linkedin: "", github: "" }
                 });
-                fetchMyBlogs(data.full_name);
+                fetchMyBlogs(USER_ID);
                 fetchBookmarks();
                 fetchUserHistory(USER_ID); // Fetch history as well
             }
@@ -69,13 +69,28 @@ export default function ProfilePage() {
         }
     };
 
+    // The listing is paginated: follow next_cursor until every one of the user's posts is loaded
+    const fetchAllUserBlogs = async (userId) => {
+        const blogs = [];
+        let cursor = null;
+        do {
+            const params = new URLSearchParams({ limit: "100" });
+            if (cursor) params.set("cursor", cursor);
+            const res = await fetch(`${API_BASE_URL}/api/blog/user/${userId}?${params}`);
+            const data = await res.json();
+            if (!data.success) return null;
+            blogs.push(...(data.blogs || []));
+            cursor = data.next_cursor;
+        } while (cursor);
+        return blogs;
+    };
+
     const fetchUserHistory = async (userId) => {
         setLoadingHistory(true);
         try {
-            const res = await fetch(`${API_BASE_URL}/api/blog/user/${userId}`);
-            const data = await res.json();
-            if (data.success) {
-                setHistory(data.blogs);
+            const blogs = await fetchAllUserBlogs(userId);
+            if (blogs) {
+                setHistory(blogs);
             }
         } catch (error) {
             console.error("Error fetching history:", error);
@@ -135,13 +150,11 @@ export default function ProfilePage() {
         setWritingStreak(streak);
     };
 
-    const fetchMyBlogs = async (authorName) => {
+    const fetchMyBlogs = async (userId) => {
         try {
-            const res = await fetch(`${API_BASE_URL}/api/blog/`);
-            const data = await res.json();
-            if (data.success) {
-                const userBlogs = data.blogs.filter(b => b.author === authorName);
-                setMyBlogs(userBlogs);
+            const blogs = await fetchAllUserBlogs(userId);
+            if (blogs) {
+                setMyBlogs(blogs);
             }
         } catch (err) {
             console.error("Failed to fetch blogs", err);
@@ -209,7 +222,7 @@ export default function ProfilePage() {
             if (data.success) {
                 setUser(data.user);
                 alert("Profile updated successfully!");
-                fetchMyBlogs(data.user.full_name);
+                fetchMyBlogs(USER_ID);
             }
         } catch (err) {
             alert("Failed to update profile");
@@ -286,7 +299,7 @@ export default function ProfilePage() {
     const filteredBlogs = myBlogs
         .filter(blog =>
             blog.title.toLowerCase().includes(searchQuery.toLowerCase()) ||
-            blog.content.toLowerCase().includes(searchQuery.toLowerCase())
+            (blog.excerpt ?? blog.content ?? "").toLowerCase().includes(searchQuery.toLowerCase())
         )
         .sort((a, b) => {
             if (sortBy === "newest") return new Date(b.created_at) - new Date(a.created_at);
@@ -298,7 +311,7 @@ export default function ProfilePage() {
     // Filter bookmarks based on search (reusing searchQuery for now, or could work for both)
     const filteredBookmarks = Array.isArray(bookmarks) ? bookmarks.filter(blog =>
         blog.title.toLowerCase().includes(searchQuery.toLowerCase()) ||
-        blog.content.toLowerCase().includes(searchQuery.toLowerCase())
+        (blog.excerpt ?? blog.content ?? "").toLowerCase().includes(searchQuery.toLowerCase())
     ) : [];
 
 
@@ -702,7 +715,7 @@ export default function ProfilePage() {
                                             </div>
                                         </div>
                                         <p style={{ color: "#cbd5e1", fontSize: "0.95rem", lineHeight: "1.5", display: "-webkit-box", WebkitLineClamp: 2, WebkitBoxOrient: "vertical", overflow: "hidden" }}>
-                                            {blog.content}
+                                            {blog.excerpt ?? blog.content}
                                         </p>
                                     </div>
                                 ))
@@ -754,7 +767,7 @@ export default function ProfilePage() {
                                             </div>
                                         </div>
                                         <p style={{ color: "#cbd5e1", fontSize: "0.95rem", lineHeight: "1.5", display: "-webkit-box", WebkitLineClamp: 2, WebkitBoxOrient: "vertical", overflow: "hidden" }}>
-                                            {blog.content}
+                                            {blog.excerpt ?? blog.content}
                                         </p>
                                     </div>
                                 ))
@@ -800,7 +813,7 @@ export default function ProfilePage() {
                                             <span style={{ color: "#64748b", fontSize: "0.85rem" }}>{new Date(blog.created_at).toLocaleDateString()}</span>
                                         </div>
                                         <p style={{ color: "#94a3b8", fontSize: "0.9rem", lineHeight: "1.6", marginBottom: "1rem", display: "-webkit-box", WebkitLineClamp: "3", WebkitBoxOrient: "vertical", overflow: "hidden" }}>
-                                            {blog.content.replace(/[#*`]/g, "")}
+                                            {(blog.excerpt ?? blog.content ?? "").replace(/[#*`]/g, "")}
                                         </p>
                                         <div style={{ display: "flex", gap: "0.5rem" }}>
                                             {blog.tags && blog.tags.map((tag, idx) => (